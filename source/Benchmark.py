@@ -0,0 +1,309 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import KnowledgeBase as kb
+from PrimeImplicates import PrimeImplicates
+from ResolutionSession import ResolutionSession
+from ResourceBudget import ResourceBudget, UNKNOWN
+
+
+# Tỉ lệ mệnh đề / biến mặc định: dễ thỏa được, trung bình, vùng chuyển pha của 3-CNF (~4.26), quá ràng buộc
+DEFAULT_RATIOS = (2.0, 3.0, 4.26, 5.0)
+DEFAULT_VARIABLES = (6, 8, 10, 12)
+
+
+def random_cnf(rng, num_vars, num_clauses, k):
+    """
+    Sinh KB k-CNF ngẫu nhiên: mỗi mệnh đề gồm k biến khác nhau với dấu ngẫu nhiên
+
+    :return: (danh sách mệnh đề dạng list chuỗi, α dạng [[literal]])
+    """
+    names = [f"X{i:02d}" for i in range(1, num_vars + 1)]
+    clauses = []
+    for _ in range(num_clauses):
+        clauses.append([rng.choice(('', '-')) + name for name in rng.sample(names, min(k, num_vars))])
+    return clauses, [[rng.choice(('', '-')) + rng.choice(names)]]
+
+
+def random_horn(rng, num_vars, num_clauses, k):
+    """
+    Sinh KB Horn xác định ngẫu nhiên (dùng được cho forward chaining): vài sự kiện
+    và các luật p1 ∧ ... ∧ p(k-1) → q, α là một biến dương
+
+    :return: (danh sách mệnh đề dạng list chuỗi, α dạng [[literal]])
+    """
+    names = [f"X{i:02d}" for i in range(1, num_vars + 1)]
+    facts = max(1, num_vars // 4)
+    clauses = [[name] for name in rng.sample(names, facts)]
+    for _ in range(num_clauses - facts):
+        variables = rng.sample(names, min(k, num_vars))
+        clauses.append(['-' + name for name in variables[1:]] + [variables[0]])
+    return clauses, [[rng.choice(names)]]
+
+
+FAMILIES = {'cnf': random_cnf, 'horn': random_horn}
+
+
+def build_knowledge_base(clauses):
+    knowledge_base = kb.KnowledgeBase()
+    for clause in clauses:
+        knowledge_base.insert(list(clause))
+    return knowledge_base
+
+
+# Mỗi engine: hàm (knowledge_base, query, budget) -> (kết quả, số mệnh đề sinh ra)
+def run_resolution(**options):
+    def run(knowledge_base, query, budget):
+        result, is_proved = knowledge_base.prove_by_resolution(query, verbose=False, record_path=False,
+                                                               budget=budget, **options)
+        return is_proved, sum(len(step_results) for step_results in result)
+    return run
+
+
+def run_given_clause(**options):
+    def run(knowledge_base, query, budget):
+        steps, is_proved = knowledge_base.prove_by_given_clause(query, verbose=False, budget=budget, **options)
+        return is_proved, sum(len(new_statements) for _, new_statements in steps)
+    return run
+
+
+def run_cdcl(knowledge_base, query, budget):
+    is_proved = knowledge_base.prove_by_cdcl(query, verbose=False)
+    return is_proved, knowledge_base.solver_stats['learned']
+
+
+def run_session(knowledge_base, query, budget):
+    session = ResolutionSession(knowledge_base, subsumption=True, budget=budget)
+    is_proved = session.prove(query)
+    return is_proved, session.stats['kb_resolvents'] + session.stats['query_resolvents']
+
+
+def run_implicates(knowledge_base, query, budget):
+    try:
+        implicates = PrimeImplicates.compile(knowledge_base, budget)
+    except ValueError:
+        # Quá trình biên dịch vượt ngân sách tài nguyên
+        return UNKNOWN, 0
+    return implicates.entails(query), implicates.stats['resolvents']
+
+
+def run_forward_chaining(knowledge_base, query, budget):
+    # Chỉ áp dụng cho KB Horn xác định: mệnh đề đơn dương là sự kiện, các mệnh đề khác là luật
+    for clause in knowledge_base.database:
+        positive = [literal for literal in clause if literal[0] != '-']
+        if len(positive) != 1:
+            raise ValueError("Forward chaining chỉ áp dụng cho KB Horn xác định")
+        if len(clause) == 1:
+            knowledge_base.facts[positive[0]] = True
+        else:
+            knowledge_base.add_rule([literal[1:] for literal in clause if literal[0] == '-'], positive[0])
+    goal = query[0][0]
+    inferred = knowledge_base.forward_chaining()
+    return goal in knowledge_base.facts or goal in inferred, len(inferred)
+
+
+ENGINES = {
+    'resolution': run_resolution(),
+    'resolution-int': run_resolution(engine='int'),
+    'resolution-numpy': run_resolution(engine='numpy'),
+    'resolution-fast': run_resolution(engine='int', incremental=True, use_index=True, subsumption=True),
+    'given-clause': run_given_clause(engine='int'),
+    'cdcl': run_cdcl,
+    'session': run_session,
+    'implicates': run_implicates,
+    'forward_chaining': run_forward_chaining,
+}
+
+
+def instances(seed, families, variables, ratios, count, k):
+    """
+    Sinh các bài toán theo lưới (họ, số biến, tỉ lệ); mỗi bài toán có seed riêng nên
+    thêm/bớt một ô của lưới không làm thay đổi các bài toán khác
+    """
+    for family in families:
+        for num_vars in variables:
+            for ratio in ratios:
+                num_clauses = max(1, round(ratio * num_vars))
+                for instance in range(count):
+                    rng = random.Random(f"{seed}-{family}-{k}-{num_vars}-{num_clauses}-{instance}")
+                    clauses, query = FAMILIES[family](rng, num_vars, num_clauses, k)
+                    yield {'family': family, 'vars': num_vars, 'clauses': num_clauses, 'ratio': ratio,
+                           'instance': instance}, clauses, query
+
+
+def measure(engine, clauses, query, max_seconds, max_clauses, repeat, memory):
+    """
+    Chạy một engine trên một bài toán
+
+    Thời gian là giá trị nhỏ nhất của repeat lần chạy; bộ nhớ đỉnh được đo ở một lần chạy
+    riêng với tracemalloc (tracemalloc làm chậm chương trình nên không dùng khi đo thời gian).
+    """
+    def budget():
+        if max_seconds is None and max_clauses is None:
+            return None
+        return ResourceBudget(max_seconds=max_seconds, max_clauses=max_clauses)
+
+    record = {}
+    try:
+        best = None
+        for _ in range(repeat):
+            knowledge_base = build_knowledge_base(clauses)
+            start_time = time.perf_counter()
+            verdict, derived = ENGINES[engine](knowledge_base, query, budget())
+            elapsed = time.perf_counter() - start_time
+            best = elapsed if best is None else min(best, elapsed)
+        record.update(status='ok' if verdict != UNKNOWN else 'unknown',
+                      verdict=verdict if verdict == UNKNOWN else ('YES' if verdict else 'NO'),
+                      seconds=best, derived=derived)
+        if memory:
+            knowledge_base = build_knowledge_base(clauses)
+            tracemalloc.start()
+            try:
+                ENGINES[engine](knowledge_base, query, budget())
+                record['peak_kb'] = tracemalloc.get_traced_memory()[1] / 1024
+            finally:
+                tracemalloc.stop()
+    except (ImportError, ValueError) as e:
+        # Engine không dùng được cho bài toán này (thiếu numpy, quá 32 biến, KB không phải Horn)
+        record.update(status='skipped', error=str(e))
+    return record
+
+
+def run_benchmark(args):
+    """
+    Chạy toàn bộ lưới bài toán với các engine được chọn và ghi kết quả ra file JSON
+    """
+    results = []
+    for problem, clauses, query in instances(args.seed, args.families, args.vars, args.ratios, args.instances, args.k):
+        for engine in args.engines:
+            if engine == 'forward_chaining' and problem['family'] != 'horn':
+                continue
+            record = dict(problem, engine=engine)
+            record.update(measure(engine, clauses, query, args.max_seconds, args.max_clauses, args.repeat,
+                                  not args.no_memory))
+            results.append(record)
+            print(f"{problem['family']:5} n={problem['vars']:<3} m={problem['clauses']:<4} #{problem['instance']} "
+                  f"{engine:17} {record['status']:8} {record.get('verdict', '-'):8} "
+                  f"{record.get('seconds', 0):10.5f} s {record.get('peak_kb', 0):10.1f} KB "
+                  f"{record.get('derived', 0):8} mệnh đề")
+
+    baseline = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'seed': args.seed, 'k': args.k, 'families': args.families, 'vars': args.vars, 'ratios': args.ratios,
+            'instances': args.instances, 'engines': args.engines, 'repeat': args.repeat,
+            'max_seconds': args.max_seconds, 'max_clauses': args.max_clauses,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=1)
+    print(f"Đã ghi {len(results)} kết quả vào {args.output}")
+
+
+def result_key(record):
+    return record['family'], record['vars'], record['clauses'], record['instance'], record['engine']
+
+
+def compare_results(baseline, current, threshold, min_seconds=0.01, min_peak_kb=64):
+    """
+    So sánh hai lần chạy benchmark
+
+    Một kết quả bị coi là chậm đi (hồi quy) khi thời gian hoặc bộ nhớ đỉnh tăng quá threshold
+    (tỉ lệ, 0.2 = 20%); các giá trị quá nhỏ (dưới min_seconds, min_peak_kb) bị bỏ qua vì nhiễu đo.
+    Kết quả YES/NO khác nhau luôn được báo.
+
+    :return: Danh sách các dòng mô tả hồi quy
+    """
+    previous = {result_key(record): record for record in baseline['results']}
+    regressions = []
+    for record in current['results']:
+        old = previous.get(result_key(record))
+        if old is None or old['status'] == 'skipped' or record['status'] == 'skipped':
+            continue
+        name = '{} n={} m={} #{} {}'.format(*result_key(record))
+        if UNKNOWN not in (old['verdict'], record['verdict']) and old['verdict'] != record['verdict']:
+            regressions.append(f"{name}: kết quả thay đổi {old['verdict']} -> {record['verdict']}")
+        elif old['status'] == 'ok' and record['status'] == 'unknown':
+            regressions.append(f"{name}: vượt giới hạn (trước đây {old['seconds']:.5f} s)")
+        for metric, floor, unit in (('seconds', min_seconds, 's'), ('peak_kb', min_peak_kb, 'KB')):
+            before, after = old.get(metric), record.get(metric)
+            if before is None or after is None or max(before, after) < floor:
+                continue
+            if after > before * (1 + threshold):
+                regressions.append(f"{name}: {metric} {before:.5f} -> {after:.5f} {unit} "
+                                   f"(+{(after / max(before, 1e-12) - 1) * 100:.1f}%)")
+    return regressions
+
+
+def compare_command(args):
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+
+    # Tổng thời gian theo engine trên các bài toán có ở cả hai lần chạy
+    previous = {result_key(record): record for record in baseline['results']}
+    totals = {}
+    for record in current['results']:
+        old = previous.get(result_key(record))
+        if old is not None and 'seconds' in old and 'seconds' in record:
+            before, after = totals.get(record['engine'], (0.0, 0.0))
+            totals[record['engine']] = (before + old['seconds'], after + record['seconds'])
+    for engine, (before, after) in totals.items():
+        print(f"{engine:17} {before:10.4f} s -> {after:10.4f} s ({(after / max(before, 1e-12) - 1) * 100:+.1f}%)")
+
+    regressions = compare_results(baseline, current, args.threshold, args.min_seconds, args.min_peak_kb)
+    for line in regressions:
+        print(f"HỒI QUY: {line}")
+    print(f"{len(regressions)} hồi quy (ngưỡng {args.threshold * 100:.0f}%)")
+    return 1 if regressions else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark hợp giải mệnh đề trên KB k-CNF ngẫu nhiên")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="Chạy benchmark và ghi kết quả (baseline) ra file JSON")
+    run.add_argument('--output', '-o', default='benchmark.json', help="File JSON kết quả")
+    run.add_argument('--seed', type=int, default=0, help="Seed sinh bài toán")
+    run.add_argument('--k', type=int, default=3, help="Số literal mỗi mệnh đề")
+    run.add_argument('--families', nargs='+', choices=sorted(FAMILIES), default=['cnf', 'horn'],
+                     help="Họ bài toán: cnf (k-CNF ngẫu nhiên), horn (Horn xác định, dùng được forward chaining)")
+    run.add_argument('--vars', type=int, nargs='+', default=list(DEFAULT_VARIABLES), help="Các số biến")
+    run.add_argument('--ratios', type=float, nargs='+', default=list(DEFAULT_RATIOS),
+                     help="Các tỉ lệ số mệnh đề / số biến (chuyển pha của 3-CNF ở khoảng 4.26)")
+    run.add_argument('--instances', type=int, default=2, help="Số bài toán mỗi ô của lưới")
+    run.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES), help="Các engine cần đo")
+    run.add_argument('--repeat', type=int, default=1, help="Số lần đo thời gian (lấy nhỏ nhất)")
+    run.add_argument('--max-seconds', type=float, default=2.0, help="Giới hạn thời gian mỗi lần chạy (giây)")
+    run.add_argument('--max-clauses', type=int, default=50000, help="Giới hạn tổng số mệnh đề mỗi lần chạy")
+    run.add_argument('--no-memory', action='store_true', help="Không đo bộ nhớ đỉnh (tracemalloc)")
+
+    compare = commands.add_parser('compare', help="So sánh hai file kết quả, báo các hồi quy vượt ngưỡng")
+    compare.add_argument('baseline', help="File JSON baseline")
+    compare.add_argument('current', help="File JSON lần chạy mới")
+    compare.add_argument('--threshold', type=float, default=0.2, help="Ngưỡng hồi quy (0.2 = chậm hơn 20%%)")
+    compare.add_argument('--min-seconds', type=float, default=0.01, help="Bỏ qua thời gian nhỏ hơn giá trị này")
+    compare.add_argument('--min-peak-kb', type=float, default=64, help="Bỏ qua bộ nhớ đỉnh nhỏ hơn giá trị này (KB)")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    if args.command == 'run':
+        run_benchmark(args)
+    else:
+        sys.exit(compare_command(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import numpy as np
+
+
+# Số cặp tối đa được xử lý trong một lần tính vector hóa (giới hạn bộ nhớ mỗi khối)
+PAIR_BLOCK_SIZE = 1 << 20
+
+
+def clause_masks(clause):
+    """
+    Chuyển mệnh đề tuple số nguyên thành hai mask (dương, phủ định), biến id k ứng với bit k - 1
+    """
+    positive = 0
+    negative = 0
+    for literal in clause:
+        if literal > 0:
+            positive |= 1 << (literal - 1)
+        else:
+            negative |= 1 << (-literal - 1)
+    return positive, negative
+
+
+def clause_from_masks(positive, negative):
+    """
+    Chuyển hai mask về tuple số nguyên đã chuẩn hóa (sắp xếp theo id biến)
+    """
+    clause = []
+    remaining = positive | negative
+    while remaining:
+        lowest = remaining & -remaining
+        symbol_id = lowest.bit_length()
+        clause.append(symbol_id if positive & lowest else -symbol_id)
+        remaining ^= lowest
+    return tuple(clause)
+
+
+def count_bits(masks):
+    # Tổng số bit bật trong một mảng uint32
+    return int(np.unpackbits(np.ascontiguousarray(masks, dtype=np.uint32).view(np.uint8)).sum())
+
+
+def is_canonical(clause):
+    # Mệnh đề đã sắp xếp và không có literal lặp lại, tức là có thể trùng với một resolvent
+    return all(abs(a) < abs(b) for a, b in zip(clause, clause[1:]))
+
+
+class BitmaskBackend:
+    """
+    Lưu cơ sở tri thức dưới dạng hai mảng uint32 (mask literal dương và phủ định)
+    và tính cả một vòng hợp giải bằng các phép toán mảng NumPy.
+
+    Mỗi mệnh đề phải vừa trong 32 bit nên KB có tối đa 32 biến (đủ cho mọi input một chữ cái A-Z);
+    KB lớn hơn dùng engine 'int'.
+    Các cặp có mệnh đề chứa literal lặp lại (ngữ nghĩa đa tập, hiếm gặp và chỉ đến từ input)
+    được hợp giải bằng apply_resolution_int để kết quả giống hệt engine chuỗi.
+    """
+
+    MAX_SYMBOLS = 32
+
+    def __init__(self, symbols, apply):
+        if len(symbols) > self.MAX_SYMBOLS:
+            raise ValueError(f"Engine numpy chỉ hỗ trợ tối đa {self.MAX_SYMBOLS} biến, KB có {len(symbols)} biến")
+        # apply: hàm hợp giải vô hướng dùng cho các cặp có literal lặp lại
+        self.apply = apply
+        self.positive = np.zeros(0, dtype=np.uint32)
+        self.negative = np.zeros(0, dtype=np.uint32)
+        # Mệnh đề không có literal lặp lại (hợp giải theo ngữ nghĩa tập hợp)
+        self.regular = np.zeros(0, dtype=bool)
+        # Khóa (dương << 32 | phủ định) của các mệnh đề chuẩn hóa đã có trong KB
+        self.known_keys = np.zeros(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.positive)
+
+    def sync(self, database):
+        """
+        Thêm vào các mảng những mệnh đề mới của database (database chỉ được thêm vào cuối)
+        """
+        new_clauses = database[len(self):]
+        if not new_clauses:
+            return
+        masks = [clause_masks(clause) for clause in new_clauses]
+        positive = np.array([mask[0] for mask in masks], dtype=np.uint32)
+        negative = np.array([mask[1] for mask in masks], dtype=np.uint32)
+        regular = np.array([len(set(clause)) == len(clause) for clause in new_clauses], dtype=bool)
+        canonical = np.array([is_canonical(clause) for clause in new_clauses], dtype=bool)
+        keys = (positive.astype(np.uint64) << np.uint64(32)) | negative.astype(np.uint64)
+
+        self.positive = np.concatenate((self.positive, positive))
+        self.negative = np.concatenate((self.negative, negative))
+        self.regular = np.concatenate((self.regular, regular))
+        self.known_keys = np.union1d(self.known_keys, keys[canonical])
+
+    def pair_blocks(self, size, start):
+        """
+        Sinh các khối cặp chỉ số (I, J), i < j, j >= start theo thứ tự itertools.combinations
+        """
+        rows = np.arange(size, dtype=np.int64)
+        lower = np.maximum(rows + 1, start)
+        counts = np.maximum(size - lower, 0)
+        ends = np.cumsum(counts)
+        row = 0
+        while row < size:
+            # Gom các hàng liên tiếp cho tới khi đủ PAIR_BLOCK_SIZE cặp (ít nhất một hàng)
+            base = ends[row] - counts[row]
+            last = max(int(np.searchsorted(ends, base + PAIR_BLOCK_SIZE, side='right')), row + 1)
+            block_counts = counts[row:last]
+            total = int(block_counts.sum())
+            if total:
+                offsets = np.cumsum(block_counts) - block_counts
+                I = np.repeat(rows[row:last], block_counts)
+                J = np.arange(total, dtype=np.int64) - np.repeat(offsets, block_counts) + np.repeat(lower[row:last], block_counts)
+                yield I, J
+            row = last
+
+    def resolve_round(self, database, start, alive, counters=None, budget=None):
+        """
+        Hợp giải một vòng bằng phép toán mảng
+
+        :param counters: Counter đếm pairs, complementary, tautologies, duplicates như
+            KnowledgeBase._apply_counted (các cặp vô hướng được đếm bởi chính hàm apply).
+            Khi đếm, resolvent trùng trong cùng khối được để lại cho _saturate phân loại
+            (trùng lặp hoặc bị subsume) giống các engine khác
+        :param budget: ResourceBudget, thời gian được kiểm tra trước mỗi khối cặp, hết thời gian thì dừng sớm
+        :return: Generator các bộ (i, j, resolvent) khác rỗng theo thứ tự cặp
+        """
+        self.sync(database)
+        size = len(database)
+        # Với chỉ mục literal, các engine khác chỉ xét (và đếm) các cặp có literal đối ngẫu
+        indexed = getattr(database, 'index', None) is not None
+        alive_mask = None if alive is None else np.asarray(alive, dtype=bool)
+        for I, J in self.pair_blocks(size, start):
+            if budget is not None and budget.check_time():
+                return
+            positive_i, negative_i = self.positive[I], self.negative[I]
+            positive_j, negative_j = self.positive[J], self.negative[J]
+
+            # Các biến xuất hiện đối ngẫu giữa hai mệnh đề
+            clash = (positive_i & negative_j) | (negative_i & positive_j)
+            candidate = clash != 0
+            if alive_mask is not None:
+                candidate &= alive_mask[I] & alive_mask[J]
+            regular = self.regular[I] & self.regular[J]
+
+            # Có từ hai biến đối ngẫu trở lên thì mọi resolvent đều là hằng đúng
+            single_pivot = (clash & (clash - np.uint32(1))) == 0
+            positive = (positive_i | positive_j) & ~clash
+            negative = (negative_i | negative_j) & ~clash
+            selected = candidate & regular & single_pivot & ((positive & negative) == 0)
+            if counters is not None:
+                if indexed:
+                    counters['pairs'] += int(candidate.sum())
+                else:
+                    counters['pairs'] += len(I) if alive_mask is None else int((alive_mask[I] & alive_mask[J]).sum())
+                regular_candidate = candidate & regular
+                counters['complementary'] += int(regular_candidate.sum())
+                # Mỗi biến đối ngẫu cho một resolvent ứng viên
+                counters['tautologies'] += (count_bits(clash[regular_candidate & ~single_pivot])
+                                            + int((regular_candidate & single_pivot).sum()) - int(selected.sum()))
+                not_known = int(selected.sum())
+
+            # Loại các resolvent đã có trong KB (mệnh đề rỗng không bao giờ có trong KB)
+            keys = (positive.astype(np.uint64) << np.uint64(32)) | negative.astype(np.uint64)
+            selected &= (keys == 0) | ~np.isin(keys, self.known_keys)
+
+            chosen = np.flatnonzero(selected)
+            if counters is None:
+                # Trùng lặp trong cùng khối: chỉ giữ lần xuất hiện đầu tiên theo thứ tự cặp
+                _, first = np.unique(keys[chosen], return_index=True)
+                chosen = chosen[np.sort(first)]
+            else:
+                counters['duplicates'] += not_known - len(chosen)
+
+            results = [(int(k), [clause_from_masks(int(positive[k]), int(negative[k]))]) for k in chosen]
+            # Các cặp có literal lặp lại được hợp giải bằng hàm vô hướng
+            for k in np.flatnonzero(candidate & ~regular):
+                resolvent = self.apply(database[int(I[k])], database[int(J[k])], database)
+                if resolvent:
+                    results.append((int(k), resolvent))
+            results.sort(key=lambda item: item[0])
+
+            for k, resolvent in results:
+                yield int(I[k]), int(J[k]), resolvent
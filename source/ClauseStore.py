@@ -0,0 +1,211 @@
+from bisect import bisect_left
+
+
+def result_key(result):
+    # Khóa băm của danh sách resolvent sinh ra từ một cặp mệnh đề
+    return tuple(map(tuple, result))
+
+
+class OccurrenceIndex:
+    """
+    Chỉ mục literal -> danh sách id các mệnh đề chứa literal đó (id tăng dần)
+    Dùng để chỉ liệt kê các cặp mệnh đề có literal đối ngẫu, tức là các cặp hợp giải được.
+    """
+
+    def __init__(self, negate):
+        # negate: hàm đảo literal (invert_literal với chuỗi, phép đổi dấu với số nguyên)
+        self.negate = negate
+        self.occurrences = {}
+
+    def add(self, clause_id, clause):
+        # Các mệnh đề được thêm theo thứ tự id nên mỗi danh sách luôn tăng dần
+        for literal in dict.fromkeys(clause):
+            self.occurrences.setdefault(literal, []).append(clause_id)
+
+    def partners(self, clause, lower):
+        """
+        Trả về các id >= lower (đã sắp xếp) của những mệnh đề chứa phủ định
+        của ít nhất một literal trong clause
+        """
+        result = set()
+        for literal in clause:
+            ids = self.occurrences.get(self.negate(literal))
+            if ids:
+                result.update(ids[bisect_left(ids, lower):])
+        return sorted(result)
+
+
+class ClauseStore:
+    """
+    Kho mệnh đề giữ nguyên thứ tự thêm vào (file output phụ thuộc vào thứ tự này)
+    và kiểm tra trùng lặp O(1) bằng bảng băm thay vì duyệt tuần tự cả list.
+
+    Khóa mặc định là tuple(clause) nên hai mệnh đề trùng nhau khi và chỉ khi
+    phép so sánh list == list mà KnowledgeBase vẫn dùng trước đây cho kết quả True.
+    """
+
+    def __init__(self, clauses=(), key=tuple):
+        self.key = key
+        self.clauses = []
+        self.keys = set()
+        # Chỉ mục literal (chỉ được tạo khi gọi enable_index)
+        self.index = None
+        for clause in clauses:
+            self.append(clause)
+
+    def enable_index(self, negate):
+        """
+        Tạo chỉ mục literal cho các mệnh đề hiện có và cập nhật nó ở mỗi lần thêm
+        """
+        self.index = OccurrenceIndex(negate)
+        for clause_id, clause in enumerate(self.clauses):
+            self.index.add(clause_id, clause)
+        return self.index
+
+    def append(self, clause):
+        # Thêm mệnh đề vào cuối kho (giống list.append)
+        if self.index is not None:
+            self.index.add(len(self.clauses), clause)
+        self.clauses.append(clause)
+        self.keys.add(self.key(clause))
+
+    def add(self, clause):
+        """
+        Thêm mệnh đề nếu chưa tồn tại
+
+        :return: True nếu mệnh đề được thêm mới
+        """
+        clause_hash = self.key(clause)
+        if clause_hash in self.keys:
+            return False
+        if self.index is not None:
+            self.index.add(len(self.clauses), clause)
+        self.clauses.append(clause)
+        self.keys.add(clause_hash)
+        return True
+
+    @classmethod
+    def from_unique(cls, clauses, key=tuple):
+        """
+        Tạo kho từ các mệnh đề đã biết là đôi một khác nhau (ví dụ KB đã biên dịch),
+        bỏ qua việc thêm từng mệnh đề
+        """
+        store = cls(key=key)
+        store.clauses = list(clauses)
+        store.keys = set(map(key, store.clauses))
+        return store
+
+    def copy(self):
+        # Sao chép nông, các mệnh đề được dùng chung như list.copy() (không sao chép chỉ mục)
+        store = ClauseStore(key=self.key)
+        store.clauses = self.clauses.copy()
+        store.keys = self.keys.copy()
+        return store
+
+    def __contains__(self, clause):
+        return self.key(clause) in self.keys
+
+    def __len__(self):
+        return len(self.clauses)
+
+    def __iter__(self):
+        return iter(self.clauses)
+
+    def __getitem__(self, index):
+        return self.clauses[index]
+
+    def __eq__(self, other):
+        if isinstance(other, ClauseStore):
+            return self.clauses == other.clauses
+        return self.clauses == other
+
+    def __repr__(self):
+        return repr(self.clauses)
+
+
+def clause_signature(clause):
+    # Chữ ký 64 bit của mệnh đề: mỗi literal bật một bit
+    # D có thể là tập con của C chỉ khi signature(D) & ~signature(C) == 0
+    signature = 0
+    for literal in clause:
+        signature |= 1 << (hash(literal) & 63)
+    return signature
+
+
+class SubsumptionIndex:
+    """
+    Chỉ mục kiểm tra subsumption (D subsume C khi D là tập con của C)
+
+    Chữ ký bitmask được dùng để loại nhanh các ứng viên trước khi so sánh tập hợp.
+    Mỗi mệnh đề được "theo dõi" bởi một literal duy nhất để tìm mệnh đề subsume,
+    và được ghi vào chỉ mục literal đầy đủ để tìm các mệnh đề bị subsume.
+    Mệnh đề rỗng không bao giờ được thêm vào vì quá trình hợp giải dừng ngay khi gặp nó.
+    """
+
+    def __init__(self):
+        # id -> (tập literal, chữ ký, literal theo dõi)
+        self.clauses = {}
+        # literal -> tập id các mệnh đề chứa literal
+        self.occurrences = {}
+        # literal -> tập id các mệnh đề được theo dõi bởi literal
+        self.watches = {}
+
+    def __len__(self):
+        return len(self.clauses)
+
+    def __contains__(self, clause_id):
+        return clause_id in self.clauses
+
+    def add(self, clause_id, clause):
+        literals = frozenset(clause)
+        watch = None
+        # Mệnh đề có literal lặp lại hợp giải theo ngữ nghĩa đa tập (xem apply_resolution)
+        # nên yếu hơn tập literal của nó: chỉ có thể bị subsume, không dùng để subsume
+        if literals and len(literals) == len(clause):
+            # Theo dõi bằng literal ít xuất hiện nhất để danh sách ứng viên ngắn
+            watch = min(literals, key=lambda literal: len(self.occurrences.get(literal, ())))
+            self.watches.setdefault(watch, set()).add(clause_id)
+        self.clauses[clause_id] = (literals, clause_signature(literals), watch)
+        for literal in literals:
+            self.occurrences.setdefault(literal, set()).add(clause_id)
+
+    def remove(self, clause_id):
+        literals, _, watch = self.clauses.pop(clause_id)
+        for literal in literals:
+            self.occurrences[literal].discard(clause_id)
+        if watch is not None:
+            self.watches[watch].discard(clause_id)
+
+    def find_subsuming(self, clause):
+        """
+        Tìm một mệnh đề trong chỉ mục là tập con của clause
+
+        :return: id mệnh đề tìm được hoặc None
+        """
+        literals = frozenset(clause)
+        signature = clause_signature(literals)
+        for literal in literals:
+            for clause_id in self.watches.get(literal, ()):
+                other, other_signature, _ = self.clauses[clause_id]
+                if other_signature & ~signature == 0 and other <= literals:
+                    return clause_id
+        return None
+
+    def find_subsumed(self, clause):
+        """
+        Tìm tất cả các mệnh đề trong chỉ mục chứa clause (bị clause subsume)
+
+        :return: Danh sách id
+        """
+        literals = frozenset(clause)
+        if not literals:
+            return list(self.clauses)
+        signature = clause_signature(literals)
+        # Mệnh đề bị subsume phải chứa mọi literal, chỉ cần duyệt danh sách ngắn nhất
+        rarest = min(literals, key=lambda literal: len(self.occurrences.get(literal, ())))
+        result = []
+        for clause_id in self.occurrences.get(rarest, ()):
+            other, other_signature, _ = self.clauses[clause_id]
+            if signature & ~other_signature == 0 and literals <= other:
+                result.append(clause_id)
+        return result
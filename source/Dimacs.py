@@ -0,0 +1,168 @@
+import io
+import mmap
+import os
+import re
+
+
+# Tên biến trong chú thích c var: cùng dạng với LogicResolver.LITERAL_PATTERN nhưng không có dấu -
+NAME_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+
+class DimacsCNF:
+    """
+    Nội dung một file DIMACS CNF: các mệnh đề là tuple số nguyên khác 0
+
+    Ngoài định dạng chuẩn, các dòng chú thích sau được hiểu thêm:
+    - c var <id> <tên>: tên của biến id (khi ghi ra dạng văn bản A OR -B)
+    - c alpha <literal> ... 0 ...: các mệnh đề của α cần chứng minh (mỗi mệnh đề kết thúc bằng 0,
+      có thể viết trên một hoặc nhiều dòng c alpha)
+    """
+
+    def __init__(self, num_vars=0, clauses=None, names=None, alpha=None):
+        self.num_vars = num_vars
+        self.clauses = clauses if clauses is not None else []
+        # id biến -> tên (chỉ các biến có chú thích c var)
+        self.names = names if names is not None else {}
+        # α dạng list các tuple số nguyên hoặc None
+        self.alpha = alpha
+
+    def name_of(self, var):
+        """
+        Tên của biến: tên trong chú thích c var, nếu không có thì X kèm id được thêm số 0 phía trước
+        để thứ tự chuỗi của tên trùng với thứ tự id
+        """
+        name = self.names.get(var)
+        if name is None:
+            name = f"X{var:0{len(str(self.num_vars))}d}"
+        return name
+
+    def literal_to_text(self, literal):
+        return ('-' if literal < 0 else '') + self.name_of(abs(literal))
+
+    def clause_to_text(self, clause):
+        # Mệnh đề dạng list chuỗi như KnowledgeBase sử dụng
+        return [self.literal_to_text(literal) for literal in clause]
+
+
+def parse_dimacs(data):
+    """
+    Phân tích nội dung DIMACS (bytes hoặc mmap) theo từng dòng, không tạo bản sao toàn bộ file
+
+    :return: DimacsCNF
+    """
+    if isinstance(data, (bytes, bytearray)):
+        data = io.BytesIO(data)
+    cnf = DimacsCNF()
+    declared = None
+    current = []
+    for line in iter(data.readline, b''):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        first = stripped[:1]
+        if first == b'c':
+            parts = stripped.split()
+            if len(parts) >= 4 and parts[1] == b'var':
+                cnf.names[int(parts[2])] = parts[3].decode('utf-8')
+            elif len(parts) >= 3 and parts[1] == b'alpha':
+                clause = []
+                for token in parts[2:]:
+                    if token == b'0':
+                        cnf.alpha = (cnf.alpha or []) + [tuple(clause)]
+                        clause = []
+                    else:
+                        clause.append(int(token))
+                if clause:
+                    cnf.alpha = (cnf.alpha or []) + [tuple(clause)]
+            continue
+        if first == b'p':
+            parts = stripped.split()
+            if len(parts) != 4 or parts[1] != b'cnf':
+                raise ValueError(f"Dòng tiêu đề DIMACS không hợp lệ: {stripped.decode('utf-8', 'replace')}")
+            cnf.num_vars = int(parts[2])
+            declared = int(parts[3])
+            continue
+        if first == b'%':
+            # Một số bộ sinh dữ liệu kết thúc file bằng dòng %
+            break
+        if declared is None:
+            raise ValueError("File DIMACS thiếu dòng tiêu đề 'p cnf'")
+
+        values = list(map(int, stripped.split()))
+        # Trường hợp thường gặp: một mệnh đề trọn vẹn trên một dòng
+        if not current and values[-1] == 0 and 0 not in values[:-1]:
+            cnf.clauses.append(tuple(values[:-1]))
+            continue
+        for value in values:
+            if value == 0:
+                cnf.clauses.append(tuple(current))
+                current = []
+            else:
+                current.append(value)
+    if current:
+        cnf.clauses.append(tuple(current))
+
+    if declared is None:
+        raise ValueError("File DIMACS thiếu dòng tiêu đề 'p cnf'")
+    if len(cnf.clauses) != declared:
+        raise ValueError(f"File DIMACS khai báo {declared} mệnh đề nhưng có {len(cnf.clauses)} mệnh đề")
+    for clause in cnf.clauses:
+        for literal in clause:
+            if abs(literal) > cnf.num_vars:
+                raise ValueError(f"Literal {literal} vượt quá số biến đã khai báo ({cnf.num_vars})")
+    check_names(cnf)
+    return cnf
+
+
+def check_names(cnf):
+    """
+    Kiểm tra các chú thích c var: hai biến khác nhau mang cùng một tên sẽ bị gộp thành một biến
+    (KB có thể trở nên mâu thuẫn) nên tên phải hợp lệ, không trùng nhau và không trùng tên X...
+    được tự đặt cho một biến không có chú thích
+    """
+    owners = {}
+    for var, name in cnf.names.items():
+        if not 1 <= var <= cnf.num_vars:
+            raise ValueError(f"Chú thích c var {var} {name}: id biến nằm ngoài 1..{cnf.num_vars}")
+        if not NAME_PATTERN.fullmatch(name):
+            raise ValueError(f"Chú thích c var {var}: tên biến không hợp lệ: {name}")
+        if name in owners:
+            raise ValueError(f"Chú thích c var: tên {name} được dùng cho cả biến {owners[name]} và {var}")
+        owners[name] = var
+        if name[0] == 'X' and name[1:].isdigit():
+            other = int(name[1:])
+            if other != var and 1 <= other <= cnf.num_vars and other not in cnf.names and cnf.name_of(other) == name:
+                raise ValueError(f"Chú thích c var {var}: tên {name} trùng tên tự đặt của biến {other}")
+
+
+def read_dimacs(filepath):
+    """
+    Đọc file DIMACS bằng mmap (file vài trăm MB không bị đọc hết vào bộ nhớ một lần)
+
+    :return: DimacsCNF
+    """
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return parse_dimacs(b'')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return parse_dimacs(data)
+
+
+def write_dimacs(f, num_vars, clauses, names=None, alpha=None, comments=()):
+    """
+    Ghi các mệnh đề số nguyên ra file văn bản f theo định dạng DIMACS CNF
+
+    :param names: Danh sách tên biến theo id (names[id]), ghi thành chú thích c var
+    :param alpha: Các mệnh đề của α (tuple số nguyên), mỗi mệnh đề ghi thành một dòng chú thích c alpha
+    :param comments: Các dòng chú thích khác
+    """
+    for comment in comments:
+        f.write(f"c {comment}\n")
+    if names is not None:
+        for var in range(1, num_vars + 1):
+            f.write(f"c var {var} {names[var]}\n")
+    for clause in alpha if alpha is not None else ():
+        f.write(f"c alpha {' '.join(map(str, clause))} 0\n")
+    f.write(f"p cnf {num_vars} {len(clauses)}\n")
+    for clause in clauses:
+        f.write(' '.join(map(str, clause)) + ' 0\n')
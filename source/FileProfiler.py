@@ -0,0 +1,105 @@
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+
+
+class FileProfiler:
+    """
+    Đo hiệu năng của một lần xử lý file: cProfile (thời gian theo hàm) và tracemalloc
+    (bộ nhớ đỉnh, các dòng lệnh cấp phát nhiều nhất)
+
+    Dùng như context manager, sau đó save(prefix) ghi prefix.prof (đọc bằng pstats, snakeviz, ...)
+    và prefix.profile.txt (tóm tắt dạng văn bản). Cả hai bộ đo đều làm chương trình chậm đi
+    nên thời gian đo được lớn hơn khi chạy bình thường.
+    """
+
+    # Số hàm / dòng cấp phát được liệt kê trong bản tóm tắt
+    TOP = 25
+
+    def __init__(self, top=TOP):
+        self.top = top
+        self.profile = cProfile.Profile()
+        self.seconds = 0.0
+        self.peak_bytes = 0
+        self.snapshot = None
+        self._start_time = None
+        self._started_tracing = False
+
+    def __enter__(self):
+        # Nếu tracemalloc đã được bật từ bên ngoài thì chỉ đặt lại đỉnh, không tắt khi kết thúc
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        else:
+            tracemalloc.reset_peak()
+        self._start_time = time.perf_counter()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.disable()
+        self.seconds = time.perf_counter() - self._start_time
+        self.peak_bytes = tracemalloc.get_traced_memory()[1]
+        # Chỉ giữ các cấp phát của chương trình, bỏ phần của chính tracemalloc và bộ nạp module
+        self.snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        ))
+        if self._started_tracing:
+            tracemalloc.stop()
+        return False
+
+    def summary(self, title=''):
+        """
+        Bản tóm tắt: thời gian, bộ nhớ đỉnh, các hàm tốn thời gian nhất
+        (theo thời gian riêng và thời gian tích lũy) và các dòng cấp phát nhiều bộ nhớ nhất
+        """
+        lines = []
+        if title:
+            lines.append(title)
+        lines.append(f"Thời gian (có bộ đo): {self.seconds:.7f} giây")
+        lines.append(f"Bộ nhớ đỉnh (tracemalloc): {self.peak_bytes / 1024:.1f} KB")
+
+        for sort_key, heading in (('tottime', 'thời gian riêng'), ('cumulative', 'thời gian tích lũy')):
+            stream = io.StringIO()
+            pstats.Stats(self.profile, stream=stream).strip_dirs().sort_stats(sort_key).print_stats(self.top)
+            lines.append('')
+            lines.append(f"=== {self.top} hàm tốn nhiều {heading} nhất ===")
+            lines.append(stream.getvalue().strip('\n'))
+
+        lines.append('')
+        lines.append(f"=== {self.top} dòng cấp phát nhiều bộ nhớ nhất (còn giữ khi kết thúc) ===")
+        for statistic in self.snapshot.statistics('lineno')[:self.top]:
+            frame = statistic.traceback[0]
+            lines.append(f"{statistic.size / 1024:10.1f} KB {statistic.count:>9} khối  "
+                         f"{frame.filename}:{frame.lineno}")
+        return '\n'.join(lines) + '\n'
+
+    def save(self, prefix, title=''):
+        """
+        Ghi prefix.prof và prefix.profile.txt (qua file tạm rồi đổi tên)
+
+        :return: (đường dẫn file .prof, đường dẫn file tóm tắt)
+        """
+        prof_path = prefix + '.prof'
+        text_path = prefix + '.profile.txt'
+        for path, write in ((prof_path, lambda temp_path: self.profile.dump_stats(temp_path)),
+                            (text_path, lambda temp_path: self._write_text(temp_path, self.summary(title)))):
+            temp_path = path + '.tmp'
+            try:
+                write(temp_path)
+                os.replace(temp_path, path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        return prof_path, text_path
+
+    @staticmethod
+    def _write_text(filepath, text):
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(text)
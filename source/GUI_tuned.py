@@ -39,6 +39,12 @@ class ResolutionVisualizer:
         self.plot_button = ttk.Button(self.reasoning_frame, text="Resolution Proof", command=self.plot_graph)
         self.plot_button.pack(pady=2, fill="x")
 
+        # Chỉ vẽ cây con dẫn tới mệnh đề rỗng
+        self.refutation_only = tk.BooleanVar(value=False)
+        self.refutation_check = ttk.Checkbutton(self.reasoning_frame, text="Refutation Only",
+                                                variable=self.refutation_only, command=self.toggle_refutation)
+        self.refutation_check.pack(pady=2, fill="x")
+
         # Nút Forward Chaining
         self.forward_button = ttk.Button(self.reasoning_frame, text="Forward Chaining", command=self.run_forward_chaining)
         self.forward_button.pack(pady=2, fill="x")
@@ -192,6 +198,11 @@ class ResolutionVisualizer:
         if hasattr(self, 'G'):
             self.plot_graph(reuse_graph=True)  # Vẽ lại đồ thị
 
+    def toggle_refutation(self):
+        """Vẽ lại đồ thị khi bật/tắt chế độ chỉ hiển thị refutation"""
+        if hasattr(self, 'G'):
+            self.plot_graph()
+
     def plot_graph(self, reuse_graph=False):
         """Vẽ đồ thị hợp giải"""
         # Xóa canvas cũ nếu có
@@ -206,14 +217,16 @@ class ResolutionVisualizer:
             self.steps_text.delete(1.0, tk.END)
             self.steps_text.insert(tk.END, f"Negated query: {self.query}\n")
             
-            # Thêm các bước hợp giải vào đồ thị
-            for i, (clause_i, clause_j, resolvent) in enumerate(self.KB.resolution_path):
+            # Thêm các bước hợp giải vào đồ thị (lấy từ đồ thị chứng minh của KB)
+            self.final_node = None
+            for i, (clause_i, clause_j, resolvent) in enumerate(self.KB.proof.steps(self.refutation_only.get())):
                 self.steps_text.insert(tk.END, f"Step {i+1}: Resolving {clause_i} and {clause_j} -> {resolvent}\n")
                 
                 # Tạo chuỗi đại diện cho các node
                 clause_i_str = ' OR '.join(clause_i)
                 clause_j_str = ' OR '.join(clause_j)
-                resolvent_str = ' OR '.join(resolvent[0])
+                resolvent_str = ' OR '.join(resolvent)
+                self.final_node = resolvent_str
                 
                 # Thêm các node và cạnh vào đồ thị
                 self.G.add_node(clause_i_str)
@@ -231,7 +244,7 @@ class ResolutionVisualizer:
         # Đặt màu cho các node
         node_colors = []
         for node in self.G.nodes:
-            if node == ' OR '.join(self.KB.resolution_path[-1][2][0]):
+            if node == self.final_node:
                 node_colors.append('lightgreen' if node == '{}' else 'lightcoral')
             else:
                 node_colors.append('skyblue')
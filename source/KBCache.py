@@ -0,0 +1,173 @@
+import gc
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+import KnowledgeBase as kb
+from ClauseStore import ClauseStore
+from SymbolTable import SymbolTable
+
+
+# Định dạng file KB đã biên dịch (.kbc), mọi số nguyên đều là int32:
+#   header | tên biến (utf-8, cách nhau bởi \n, đệm tới bội của 4 byte)
+#   | offset các mệnh đề query (nq + 1) | literal của query
+#   | offset các mệnh đề KB (n + 1) | literal của KB
+# Literal được mã hóa theo SymbolTable: +id / -id, id bắt đầu từ 1.
+MAGIC = b'PLKB'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIIII')
+BYTE_ORDER = {'little': 0, 'big': 1}[sys.byteorder]
+
+
+def _aligned(size):
+    return (size + 3) & ~3
+
+
+def _read_ints(data, position, count):
+    # Đọc count số int32 bắt đầu từ position của vùng nhớ mmap (các view được giải phóng trước khi đóng mmap)
+    with memoryview(data) as view, view[position:position + 4 * count] as raw, raw.cast('i') as values:
+        return values.tolist()
+
+
+def _valid_offsets(offsets, total):
+    # Offset các mệnh đề phải bắt đầu từ 0, không giảm và kết thúc đúng ở số literal của phần đó
+    return offsets[0] == 0 and offsets[-1] == total and all(a <= b for a, b in zip(offsets, offsets[1:]))
+
+
+def compile_kb(knowledge_base, query, filepath):
+    """
+    Ghi KB (đúng thứ tự và nội dung của knowledge_base.database) và query ra file nhị phân
+
+    File được ghi vào filepath.tmp rồi đổi tên, nên không bao giờ có file cache ghi dở.
+    """
+    symbols = SymbolTable.from_clauses(list(knowledge_base.database) + query)
+    names = '\n'.join(symbols.names[1:]).encode('utf-8')
+
+    sections = []
+    for clauses in (query, knowledge_base.database):
+        offsets = array('i', [0])
+        literals = array('i')
+        for clause in clauses:
+            literals.extend(symbols.encode_clause(clause))
+            offsets.append(len(literals))
+        sections.append((offsets, literals))
+    (query_offsets, query_literals), (offsets, literals) = sections
+
+    temp_path = filepath + '.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, BYTE_ORDER, len(names), len(symbols),
+                                len(query), len(query_literals), len(knowledge_base.database)))
+            f.write(names.ljust(_aligned(len(names)), b'\0'))
+            for values in (query_offsets, query_literals, offsets, literals):
+                values.tofile(f)
+        os.replace(temp_path, filepath)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def load_kb(filepath):
+    """
+    Đọc file KB đã biên dịch bằng mmap, không kiểm tra lại trùng lặp và hằng đúng như insert
+
+    :return: (KnowledgeBase, query) hoặc None nếu file không đọc được bằng phiên bản này
+             hoặc kích thước các phần không khớp với header (file bị cắt cụt hay hỏng)
+    """
+    if os.path.getsize(filepath) < HEADER.size:
+        return None
+    with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        magic, version, byte_order, names_size, num_symbols, num_query, num_query_literals, num_clauses = \
+            HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION or byte_order != BYTE_ORDER:
+            return None
+
+        # Kích thước tới hết phần offset của KB, phần literal của KB phụ thuộc offset cuối cùng
+        fixed_size = (HEADER.size + _aligned(names_size)
+                      + 4 * (num_query + 1 + num_query_literals + num_clauses + 1))
+        if len(data) < fixed_size:
+            return None
+
+        position = HEADER.size
+        names = data[position:position + names_size].decode('utf-8').split('\n') if num_symbols else []
+        if len(names) != num_symbols:
+            return None
+        position += _aligned(names_size)
+
+        # Bảng literal: texts[code + num_symbols] là chuỗi (đã intern) của literal code
+        texts = [sys.intern('-' + name) for name in reversed(names)] + [None] + [sys.intern(name) for name in names]
+
+        query_offsets = _read_ints(data, position, num_query + 1)
+        position += 4 * len(query_offsets)
+        query_literals = _read_ints(data, position, num_query_literals)
+        position += 4 * len(query_literals)
+        offsets = _read_ints(data, position, num_clauses + 1)
+        position += 4 * len(offsets)
+        if offsets[-1] < 0 or len(data) != position + 4 * offsets[-1]:
+            return None
+        if not _valid_offsets(query_offsets, num_query_literals) or not _valid_offsets(offsets, offsets[-1]):
+            return None
+        literals = _read_ints(data, position, offsets[-1])
+
+    # Tạm tắt bộ gom rác vòng: tạo hàng triệu list nhỏ liên tiếp sẽ kích hoạt nó rất nhiều lần
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        decoded = [texts[code + num_symbols] for code in query_literals]
+        query = [decoded[query_offsets[i]:query_offsets[i + 1]] for i in range(num_query)]
+        decoded = [texts[code + num_symbols] for code in literals]
+        knowledge_base = kb.KnowledgeBase()
+        knowledge_base.database = ClauseStore.from_unique(decoded[offsets[i]:offsets[i + 1]]
+                                                          for i in range(num_clauses))
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return knowledge_base, query
+
+
+class KBCache:
+    """
+    Thư mục chứa các KB đã biên dịch, mỗi file <hash>.kbc ứng với một nội dung input
+
+    Khóa là SHA-256 của nội dung file input cùng các tùy chọn ảnh hưởng tới KB sau khi đọc
+    (định dạng input, α, các bước tiền xử lý), nên sửa file input hay đổi tùy chọn sẽ tạo
+    khóa mới thay vì đọc nhầm KB cũ.
+    """
+
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, input_path, *options):
+        digest = hashlib.sha256()
+        digest.update(repr((VERSION,) + options).encode('utf-8'))
+        with open(input_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.kbc')
+
+    def load(self, key):
+        """
+        :return: (KnowledgeBase, query) hoặc None nếu chưa có trong cache
+        """
+        filepath = self.path(key)
+        loaded = load_kb(filepath) if os.path.exists(filepath) else None
+        if loaded is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return loaded
+
+    def store(self, key, knowledge_base, query):
+        compile_kb(knowledge_base, query, self.path(key))
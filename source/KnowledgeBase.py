@@ -1,20 +1,42 @@
+import functools
+import heapq
 import itertools
-from collections import defaultdict
+import operator
+import time
+from collections import Counter, defaultdict
+from SymbolTable import SymbolTable
+from ClauseStore import ClauseStore, OccurrenceIndex, SubsumptionIndex, result_key
+from SatSolver import CDCLSolver
+from ResourceBudget import UNKNOWN
+from ProofDAG import ProofDAG
 
 class KnowledgeBase:
     def __init__(self):
-        # Khởi tạo cơ sở dữ liệu để lưu các mệnh đề
-        self.database = []
-        # Lưu lại đường đi của quá trình hợp giải
-        self.resolution_path = []
+        # Khởi tạo cơ sở dữ liệu để lưu các mệnh đề (giữ thứ tự, kiểm tra trùng O(1))
+        self.database = ClauseStore()
+        # Đồ thị chứng minh của lần hợp giải gần nhất (xem resolution_path)
+        self.proof = ProofDAG()
         # Lưu các bước suy luận
         self.steps = []
+        # Bảng ký hiệu của lần hợp giải gần nhất bằng engine số nguyên
+        self.symbol_table = None
+        # Thống kê của lần chạy bộ giải CDCL gần nhất
+        self.solver_stats = None
+        # Giới hạn tài nguyên đã bị vượt ở lần hợp giải gần nhất (xem ResourceBudget.exceeded)
+        self.budget_exceeded = None
+        # Số liệu theo từng vòng của lần hợp giải gần nhất (khi bật metrics)
+        self.metrics = []
         
         # Các thuộc tính mới cho forward và backward chaining
         self.facts = {}  # Lưu trữ các sự kiện
         self.rules = []  # Lưu trữ các luật suy luận
         self.goal_stack = []  # Ngăn xếp để theo dõi mục tiêu trong backward chaining
 
+    @property
+    def resolution_path(self):
+        # Đường đi của quá trình hợp giải dạng (mệnh đề i, mệnh đề j, các resolvent), dựng lại từ self.proof
+        return self.proof.path()
+
     def insert(self, statement):
         # Thêm một mệnh đề mới vào cơ sở dữ liệu nếu nó chưa tồn tại và không mâu thuẫn
         if statement not in self.database and not self.has_contradiction(statement):
@@ -27,25 +49,63 @@ class KnowledgeBase:
         else:
             return '-' + literal
 
-    def invert_expression(self, expression):
-        # Phủ định một biểu thức logic
-        result = []
-        for statement in expression:
-            temp = []
-            for literal in statement:
-                temp.append([self.invert_literal(literal)])
-            result.append(temp)
-        
-        # Nếu chỉ có một mệnh đề, trả về dạng phẳng
-        if len(result) == 1:
-            return list(itertools.chain.from_iterable(result))
-        else:
-            return result
+    def invert_expression(self, expression, negation='distribute'):
+        """
+        Phủ định một biểu thức CNF (list các mệnh đề), kết quả luôn là list các mệnh đề
+
+        negation='distribute': phân phối ¬(C1 ∧ ... ∧ Cm) = ¬C1 ∨ ... ∨ ¬Cm thành CNF,
+        mỗi mệnh đề chọn một literal phủ định từ mỗi Ci (số mệnh đề là tích các |Ci|)
+        negation='tseitin': với α nhiều mệnh đề, thêm biến mới d_i ("Ci sai") cho mỗi Ci không đơn,
+        ¬α trở thành (d_1 ∨ ... ∨ d_m) và các mệnh đề (-d_i ∨ ¬l) với l thuộc Ci, kích thước tuyến tính.
+        KB ∧ ¬α không thỏa được khi và chỉ khi KB ∧ (dạng định nghĩa) không thỏa được.
+        Với α chỉ có một mệnh đề, hai cách cho cùng kết quả (các mệnh đề đơn ¬l).
+        """
+        if negation not in ('distribute', 'tseitin'):
+            raise ValueError(f"Cách phủ định α không hợp lệ: {negation}")
+        # α rỗng: không có mệnh đề phủ định nào
+        if not expression:
+            return []
+        # α chứa mệnh đề rỗng (luôn sai): ¬α luôn đúng
+        if any(not statement for statement in expression):
+            return []
+        inverted = [[self.invert_literal(literal) for literal in dict.fromkeys(statement)]
+                    for statement in expression]
+
+        if negation == 'distribute' or len(expression) == 1:
+            return [list(dict.fromkeys(choice)) for choice in itertools.product(*inverted)]
+
+        fresh = iter(self.fresh_symbols(sum(len(statement) > 1 for statement in inverted), expression))
+        disjunction = []
+        definitions = []
+        for statement in inverted:
+            if len(statement) == 1:
+                # Mệnh đề đơn l: ¬Ci chính là literal ¬l, không cần biến mới
+                disjunction.append(statement[0])
+                continue
+            symbol = next(fresh)
+            disjunction.append(symbol)
+            definitions.extend([self.invert_literal(symbol), literal] for literal in statement)
+        return [list(dict.fromkeys(disjunction))] + definitions
+
+    def fresh_symbols(self, count, expression=()):
+        """
+        Tạo count tên biến _T1, _T2, ... chưa xuất hiện trong KB và trong expression
+        """
+        used = {literal.lstrip('-') for clause in itertools.chain(self.database, expression) for literal in clause}
+        symbols = []
+        index = 0
+        while len(symbols) < count:
+            index += 1
+            if f"_T{index}" not in used:
+                symbols.append(f"_T{index}")
+        return symbols
 
     def is_subset_exists(self, statement, statement_list):
         # Kiểm tra xem một mệnh đề có là tập con của bất kỳ mệnh đề nào trong list không
+        # (với số lượng lớn mệnh đề nên dùng ClauseStore.SubsumptionIndex)
+        literals = set(statement)
         for existing in statement_list:
-            if set(existing).issubset(set(statement)):
+            if literals.issuperset(existing):
                 return True
         return False
 
@@ -69,13 +129,13 @@ class KnowledgeBase:
         # Loại bỏ các literal trùng lặp
         unique_literals = list(dict.fromkeys(statement))
         
-        # Chuyển đổi sang dạng tuple để sắp xếp
+        # Chuyển đổi sang dạng tuple (tên biến, dấu) để sắp xếp, tên biến có thể dài nhiều ký tự
         formatted_literals = []
         for literal in unique_literals:
             if literal[0] == '-':
-                formatted_literals.append((literal[1], -1))
+                formatted_literals.append((literal[1:], -1))
             else:
-                formatted_literals.append((literal[0], 1))
+                formatted_literals.append((literal, 1))
         formatted_literals.sort()
         
         # Chuyển đổi lại về dạng chuỗi
@@ -87,8 +147,11 @@ class KnowledgeBase:
                 result.append(item[0])
         return result
 
-    def apply_resolution(self, stmt1, stmt2):
+    def apply_resolution(self, stmt1, stmt2, known=None):
         # Áp dụng quy tắc hợp giải trên hai mệnh đề
+        # known: kho mệnh đề dùng để loại resolvent trùng (mặc định là self.database)
+        if known is None:
+            known = self.database
         derived_statements = []
         for literal in stmt1:
             opposite = self.invert_literal(literal)
@@ -104,55 +167,588 @@ class KnowledgeBase:
                 else:
                     combined = temp_stmt1 + temp_stmt2
                     standardized = self.standardize_statement(combined)
-                    if not self.has_contradiction(standardized) and standardized not in self.database:
+                    if not self.has_contradiction(standardized) and standardized not in known:
                         derived_statements.append(standardized)
         return derived_statements
 
-    def prove_by_resolution(self, target):
+    def candidate_pairs(self, database, start=0, alive=None):
+        """
+        Sinh các cặp chỉ số (i, j), i < j theo đúng thứ tự của itertools.combinations
+
+        Nếu database có chỉ mục literal (ClauseStore.enable_index), chỉ sinh các cặp
+        có literal đối ngẫu; các cặp bị bỏ qua vốn không sinh ra resolvent nào.
+
+        :param start: Bỏ qua các cặp mà cả hai mệnh đề đều có chỉ số < start
+        :param alive: Danh sách cờ, bỏ qua các mệnh đề đã bị loại (subsumption)
+        """
+        size = len(database)
+        index = getattr(database, 'index', None)
+        for i in range(size):
+            if alive is not None and not alive[i]:
+                continue
+            lower = max(i + 1, start)
+            if index is None:
+                partners = range(lower, size)
+            else:
+                partners = index.partners(database[i], lower)
+            for j in partners:
+                if alive is None or alive[j]:
+                    yield i, j
+
+    def prove_by_resolution(self, target, **options):
         # Phương pháp chứng minh bằng hợp giải
-        # Tạo một bản sao tạm thời của cơ sở tri thức
-        temp_kb = KnowledgeBase()
-        temp_kb.database = self.database.copy()
+        # Các tùy chọn giống prove_by_resolution_stream, kết quả là toàn bộ các vòng
+        proof_steps = []
+        is_proved = False
+        for new_statements, is_proved in self.prove_by_resolution_stream(target, **options):
+            if new_statements is not None:
+                proof_steps.append(new_statements)
+        return proof_steps, is_proved
+
+    def prove_by_resolution_stream(self, target, engine='string', incremental=False, use_index=False,
+                                   subsumption=False, unit_propagation=None, record_path=True, budget=None,
+                                   metrics=False, verbose=True, workers=1, negation='distribute'):
+        """
+        Chứng minh bằng hợp giải, sinh ra từng vòng ngay khi vòng đó kết thúc
+
+        Mỗi phần tử là (các mệnh đề mới của vòng, kết quả): kết quả là None khi còn vòng tiếp theo,
+        True/False (hoặc UNKNOWN khi hết ngân sách) ở phần tử cuối cùng. Khi không ghi vết (unit_propagation='fast')
+        chỉ có một phần tử (None, kết quả).
 
+        engine='int' dùng lõi mệnh đề số nguyên, kết quả giống hệt engine chuỗi
+        engine='numpy' dùng mask bit và tính cả vòng bằng NumPy (tối đa 32 biến), kết quả như 'int'
+        incremental=True chỉ hợp giải các cặp có ít nhất một mệnh đề sinh ra ở vòng trước,
+        các cặp cũ x cũ đã được hợp giải và mọi resolvent của chúng đã nằm trong KB
+        use_index=True dùng chỉ mục literal để chỉ thử các cặp có literal đối ngẫu
+        subsumption=True bật forward/backward subsumption (thay đổi các mệnh đề được liệt kê)
+        unit_propagation='trace' lan truyền mệnh đề đơn trước rồi hợp giải trên KB đã rút gọn,
+        'fast' chỉ trả về kết quả YES/NO
+        record_path=False không dựng đồ thị chứng minh self.proof, bộ nhớ chỉ còn phụ thuộc vào tập mệnh đề của KB
+        budget: ResourceBudget giới hạn thời gian, số mệnh đề và bộ nhớ; khi vượt giới hạn phần tử cuối
+        chứa các mệnh đề của vòng dở dang, kết quả là UNKNOWN và self.budget_exceeded cho biết giới hạn nào
+        metrics=True ghi số liệu của mỗi vòng vào self.metrics (xem _saturate)
+        verbose=False tắt mọi dòng in ra console (in từng bước là phần tốn thời gian nhất khi KB lớn)
+        workers > 1 chia các cặp của mỗi vòng cho nhiều tiến trình (engine 'string' hoặc 'int'),
+        kết quả giống hệt khi chạy tuần tự
+        negation: cách phủ định α, 'distribute' hoặc 'tseitin' (xem invert_expression)
+        """
+        self.metrics = []
+        self.budget_exceeded = None
+        if budget is not None:
+            budget.start()
         # Phủ định mệnh đề cần chứng minh
-        negated_target = self.invert_expression(target)
-        print(f"Mệnh đề phủ định: {negated_target}")
-        for neg_stmt in negated_target:
-            temp_kb.insert(neg_stmt)
-        
-        proof_steps = []
+        negated_target = self.invert_expression(target, negation)
+        if verbose:
+            print(f"Mệnh đề phủ định: {negated_target}")
+
+        database, apply, negate, decode, empty = self._refutation_database(negated_target, engine)
+        self.proof = ProofDAG(negate, decode)
+
+        trace = unit_propagation != 'fast'
+        if unit_propagation is not None:
+            conflict, assigned, simplified = self.propagate_units(database, negate)
+            if conflict:
+                if verbose:
+                    print(f"Lan truyền mệnh đề đơn: mâu thuẫn sau khi gán {len(assigned)} literal")
+                yield ([empty] if trace else None), True
+                return
+            if verbose:
+                print(f"Lan truyền mệnh đề đơn: gán {len(assigned)} literal, còn lại {len(simplified)} mệnh đề")
+            database = ClauseStore()
+            for clause in simplified:
+                database.add(clause)
+
+        if use_index:
+            database.enable_index(negate)
+        # Bộ đếm của vòng hiện tại, được _saturate ghi lại và xóa sau mỗi vòng
+        counters = None
+        if metrics:
+            counters = Counter()
+            apply = functools.partial(self._apply_counted, apply, negate, empty, counters=counters)
+        executor = None
+        if workers > 1:
+            # Import tại đây vì ParallelRound import lại module này
+            from ParallelRound import ParallelRoundExecutor
+            executor = ParallelRoundExecutor(engine, workers, apply)
+            resolve_round = functools.partial(executor.resolve_round, counters=counters, budget=budget)
+        elif engine == 'numpy':
+            # Chỉ import khi cần để NumPy là phụ thuộc tùy chọn
+            from BitmaskBackend import BitmaskBackend
+            resolve_round = functools.partial(BitmaskBackend(self.symbol_table, apply).resolve_round,
+                                              counters=counters, budget=budget)
+        else:
+            resolve_round = functools.partial(self._resolve_round, apply=apply, counters=counters, budget=budget)
+        try:
+            yield from self._saturate(database, resolve_round, decode, empty, incremental, subsumption, trace,
+                                      record_path, budget, counters, verbose)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def _refutation_database(self, negated_target, engine):
+        """
+        Cơ sở tri thức tạm thời gồm KB và các mệnh đề phủ định mục tiêu, cùng các hàm của engine
+
+        :return: (database, apply, negate, decode, empty) với engine 'string' (mệnh đề chuỗi)
+                 hoặc engine số nguyên ('int', 'numpy', bảng ký hiệu lưu trong self.symbol_table)
+        """
+        if engine == 'string':
+            self.symbol_table = None
+            # Tạo một bản sao tạm thời của cơ sở tri thức
+            temp_kb = KnowledgeBase()
+            temp_kb.database = ClauseStore(self.database)
+            for neg_stmt in negated_target:
+                temp_kb.insert(neg_stmt)
+            return temp_kb.database, self.apply_resolution, self.invert_literal, (lambda clause: clause), ['{}']
+        database = self._encode_database(negated_target)
+        return database, self.apply_resolution_int, operator.neg, self.symbol_table.decode_clause, ()
+
+    def _resolve_round(self, database, start, alive, apply, counters=None, budget=None):
+        """
+        Hợp giải từng cặp ứng viên của một vòng
+
+        :param apply: Hàm hợp giải (stmt1, stmt2, known) -> danh sách resolvent
+        :param counters: Counter đếm số cặp được xét ('pairs'), None thì không đếm
+        :param budget: ResourceBudget, hết thời gian thì dừng sớm (budget.exceeded cho biết giới hạn)
+        :return: Generator các bộ (i, j, resolvent) khác rỗng theo thứ tự cặp
+        """
+        for count, (i, j) in enumerate(self.candidate_pairs(database, start, alive), 1):
+            if budget is not None and count % budget.CHECK_INTERVAL == 0 and budget.check_time():
+                return
+            if counters is not None:
+                counters['pairs'] += 1
+            resolvent = apply(database[i], database[j], database)
+            if resolvent:
+                yield i, j, resolvent
+
+    def _apply_counted(self, apply, negate, empty, stmt1, stmt2, known, counters):
+        """
+        Gọi hàm hợp giải và đếm số cặp có literal đối ngẫu ('complementary'),
+        số resolvent hằng đúng ('tautologies') và đã có trong KB ('duplicates')
+
+        Kết quả giống hệt apply(stmt1, stmt2, known).
+        """
+        # Mỗi lần xuất hiện của literal có phủ định trong stmt2 cho một resolvent ứng viên
+        pivots = sum(1 for literal in stmt1 if negate(literal) in stmt2)
+        if not pivots:
+            return []
+        counters['complementary'] += 1
+        candidates = apply(stmt1, stmt2, ())
+        counters['tautologies'] += pivots - len(candidates)
+        derived_statements = [res for res in candidates if res == empty or res not in known]
+        counters['duplicates'] += len(candidates) - len(derived_statements)
+        return derived_statements
+
+    def _saturate(self, database, resolve_round, decode, empty, incremental=False, subsumption=False,
+                  trace=True, record_path=True, budget=None, counters=None, verbose=True):
+        """
+        Vòng lặp hợp giải theo từng vòng, dùng chung cho mọi engine (generator)
+
+        :param database: ClauseStore chứa KB và các mệnh đề phủ định mục tiêu
+        :param resolve_round: Hàm (database, start, alive) sinh các (i, j, resolvent) của một vòng
+        :param decode: Hàm chuyển mệnh đề về list chuỗi để in và lưu đường đi
+        :param empty: Biểu diễn mệnh đề rỗng của engine
+        :param trace: False thì không in, không lưu đường đi và chỉ sinh ra (None, kết quả)
+        :param record_path: False thì không dựng đồ thị chứng minh self.proof
+        :param budget: ResourceBudget (đã start) được kiểm tra sau mỗi resolvent mới và cuối mỗi vòng;
+            resolve_round tự kiểm tra thời gian giữa các cặp và dừng sớm khi hết thời gian
+        :param counters: Counter được resolve_round cập nhật; nếu có, mỗi vòng ghi một dict vào self.metrics
+            gồm round, pairs, complementary, tautologies, duplicates, subsumed, resolvents, added và seconds
+        :param verbose: False thì không in các bước
+        :return: Generator các bộ (mệnh đề mới của vòng, None hoặc kết quả chứng minh)
+        """
+        alive = None
+        subsumption_index = None
+        if subsumption:
+            alive, subsumption_index = self._build_subsumption_index(database)
+
+        # Id nút trong self.proof của mỗi mệnh đề trong database
+        nodes = None
+        if trace and record_path:
+            nodes = [self.proof.add_input(clause) for clause in database]
+
         step_counter = 1
+        start = 0
+        # Tổng số literal của KB, dùng để ước lượng bộ nhớ
+        literals = sum(len(clause) for clause in database) if budget is not None else 0
+        round_number = 0
         while True:
-            # Tạo tất cả các cặp mệnh đề có thể
-            statement_pairs = list(itertools.combinations(range(len(temp_kb.database)), 2))
-            
-            # Lưu các mệnh đề mới được sinh ra từ hợp giải
-            new_statements = []
-            for pair in statement_pairs:
-                resolvent = temp_kb.apply_resolution(temp_kb.database[pair[0]], temp_kb.database[pair[1]])
-                if resolvent and resolvent not in new_statements:
-                    new_statements.append(resolvent)
-                    # Lưu lại các bước hợp giải
-                    self.resolution_path.append((temp_kb.database[pair[0]], temp_kb.database[pair[1]], resolvent))
-                    print(f"Bước {step_counter}: Hợp giải {temp_kb.database[pair[0]]} và {temp_kb.database[pair[1]]} -> {resolvent}")
+            round_number += 1
+            round_started = time.perf_counter()
+            # Lưu các mệnh đề mới được sinh ra từ hợp giải (kiểm tra trùng bằng bảng băm)
+            new_statements = ClauseStore(key=result_key)
+            size = len(database)
+            accepted = 0
+            round_clauses = round_literals = 0
+            exceeded = None
+            # Nút sinh ra đầu tiên của mỗi resolvent trong vòng này
+            round_nodes = {}
+            # Hợp giải các cặp mệnh đề (tất cả các cặp nếu start = 0)
+            for i, j, resolvent in resolve_round(database, start, alive):
+                if subsumption_index is not None:
+                    # Forward subsumption: bỏ resolvent đã bị một mệnh đề còn sống subsume.
+                    # Resolvent được giữ lại nhận trước id mà nó sẽ có khi thêm vào KB
+                    kept = []
+                    for res in resolvent:
+                        if res == empty:
+                            kept.append(res)
+                        elif subsumption_index.find_subsuming(res) is None:
+                            subsumption_index.add(size + accepted, res)
+                            accepted += 1
+                            kept.append(res)
+                    if counters is not None:
+                        counters['subsumed'] += len(resolvent) - len(kept)
+                    resolvent = kept
+                if not resolvent:
+                    continue
+                if not new_statements.add(resolvent):
+                    if counters is not None:
+                        counters['duplicates'] += len(resolvent)
+                    continue
+                if nodes is not None:
+                    # Lưu lại các bước hợp giải vào đồ thị chứng minh
+                    for res in resolvent:
+                        node = self.proof.add_resolvent(res, nodes[i], nodes[j], round_number)
+                        round_nodes.setdefault(tuple(res), node)
+                        if res == empty and self.proof.root is None:
+                            self.proof.root = node
+                if trace and verbose:
+                    decoded = [decode(res) for res in resolvent]
+                    print(f"Bước {step_counter}: Hợp giải {decode(database[i])} và {decode(database[j])} -> {decoded}")
                     step_counter += 1
+                if budget is not None:
+                    round_clauses += len(resolvent)
+                    round_literals += sum(len(res) for res in resolvent)
+                    exceeded = budget.check(size + round_clauses, round_clauses, literals + round_literals)
+                    if exceeded:
+                        break
+            # resolve_round dừng sớm khi hết thời gian giữa các cặp: vòng chưa xét hết các cặp
+            truncated = budget is not None and not exceeded and budget.exceeded is not None
+            if budget is not None and not exceeded:
+                # Kiểm tra lần cuối trước vòng sau (kể cả vòng không sinh ra resolvent mới nào)
+                exceeded = truncated or budget.check(size + round_clauses, round_clauses, literals + round_literals)
 
             # Làm phẳng danh sách các mệnh đề mới
             new_statements = list(itertools.chain.from_iterable(new_statements))
-            proof_steps.append(new_statements)
+            # Nếu không có mệnh đề mới nào được tạo ra (sau khi xét hết các cặp) thì thất bại,
+            # nếu tìm thấy mệnh đề rỗng thì chứng minh thành công
+            if empty in new_statements:
+                is_proved = True
+            else:
+                is_proved = False if not new_statements and not truncated else None
+            if exceeded and is_proved is None:
+                # Hết ngân sách: dừng với vòng dở dang và kết quả UNKNOWN
+                self.budget_exceeded = budget.exceeded
+                is_proved = UNKNOWN
+            if is_proved is not None and counters is not None:
+                self._record_metrics(round_number, counters, len(new_statements), 0, round_started)
+            if trace:
+                yield new_statements, is_proved
+            elif is_proved is not None:
+                yield None, is_proved
+            if is_proved is not None:
+                return
+
+            # Thêm các mệnh đề mới vào cơ sở tri thức
+            if incremental:
+                start = size
+            for res in new_statements:
+                if database.add(res):
+                    if alive is not None:
+                        alive.append(True)
+                    if nodes is not None:
+                        nodes.append(round_nodes[tuple(res)])
+            literals += round_literals
+            if counters is not None:
+                self._record_metrics(round_number, counters, len(new_statements), len(database) - size, round_started)
+            if subsumption_index is not None:
+                # Backward subsumption: loại các mệnh đề bị resolvent mới subsume
+                for clause_id in range(size, len(database)):
+                    if alive[clause_id]:
+                        self._retire_subsumed(database[clause_id], clause_id, alive, subsumption_index)
+
+    def _record_metrics(self, round_number, counters, resolvents, added, round_started):
+        # Ghi số liệu của một vòng vào self.metrics và xóa bộ đếm cho vòng sau
+        self.metrics.append({
+            'round': round_number,
+            'pairs': counters['pairs'],
+            'complementary': counters['complementary'],
+            'tautologies': counters['tautologies'],
+            'duplicates': counters['duplicates'],
+            'subsumed': counters['subsumed'],
+            'resolvents': resolvents,
+            'added': added,
+            'seconds': time.perf_counter() - round_started,
+        })
+        counters.clear()
+
+    def _build_subsumption_index(self, database):
+        """
+        Tạo chỉ mục subsumption cho các mệnh đề ban đầu, loại luôn các mệnh đề dư thừa
 
-            # Nếu không có mệnh đề mới nào được tạo ra
-            if not new_statements:
-                return proof_steps, False
+        :return: (danh sách cờ còn sống, SubsumptionIndex)
+        """
+        alive = []
+        subsumption_index = SubsumptionIndex()
+        for clause_id, clause in enumerate(database):
+            if subsumption_index.find_subsuming(clause) is not None:
+                alive.append(False)
+                continue
+            alive.append(True)
+            self._retire_subsumed(clause, clause_id, alive, subsumption_index)
+            subsumption_index.add(clause_id, clause)
+        return alive, subsumption_index
+
+    def _retire_subsumed(self, clause, clause_id, alive, subsumption_index):
+        # Loại khỏi quá trình hợp giải các mệnh đề (khác clause_id) bị clause subsume.
+        # Mệnh đề có literal lặp lại (ngữ nghĩa đa tập) không thay thế được mệnh đề nó chứa
+        if len(set(clause)) != len(clause):
+            return
+        for other_id in subsumption_index.find_subsumed(clause):
+            if other_id != clause_id:
+                alive[other_id] = False
+                subsumption_index.remove(other_id)
+
+#--------------------------------Lõi hợp giải trên mệnh đề số nguyên---------------------------------
+
+    def apply_resolution_int(self, stmt1, stmt2, known):
+        """
+        Hợp giải hai mệnh đề dạng tuple số nguyên (xem SymbolTable)
+
+        Giữ đúng ngữ nghĩa của apply_resolution: mỗi lần xuất hiện của literal trong stmt1
+        cho một resolvent và chỉ một lần xuất hiện của cặp literal đối ngẫu bị loại bỏ.
+
+        :param known: Kho các mệnh đề đã có trong cơ sở tri thức (ClauseStore hoặc set)
+        :return: Danh sách resolvent, mệnh đề rỗng là ()
+        """
+        derived_statements = []
+        for literal in stmt1:
+            if -literal in stmt2:
+                if len(stmt1) == 1 and len(stmt2) == 1:
+                    derived_statements.append(())
+                    continue
+                combined = set(stmt1)
+                combined.update(stmt2)
+                # Chỉ bỏ literal nếu nó không bị lặp lại trong mệnh đề gốc
+                if stmt1.count(literal) == 1:
+                    combined.discard(literal)
+                if stmt2.count(-literal) == 1:
+                    combined.discard(-literal)
+                if any(-x in combined for x in combined):
+                    continue
+                # Id được cấp theo thứ tự tên nên sắp xếp theo abs(id) là đủ
+                standardized = tuple(sorted(combined, key=abs))
+                if standardized not in known:
+                    derived_statements.append(standardized)
+        return derived_statements
+
+    def _encode_database(self, negated_target):
+        """
+        Tạo bảng ký hiệu (self.symbol_table) và cơ sở tri thức tạm thời dạng tuple số nguyên
+        gồm KB và các mệnh đề phủ định mục tiêu
+        """
+        symbols = SymbolTable.from_clauses(itertools.chain(self.database, negated_target))
+        self.symbol_table = symbols
+
+        database = ClauseStore(symbols.encode_clause(stmt) for stmt in self.database)
+        for neg_stmt in negated_target:
+            encoded = symbols.encode_clause(neg_stmt)
+            if not any(-x in encoded for x in encoded):
+                database.add(encoded)
+        return database
+
+    def encode_refutation(self, target, negation='distribute'):
+        """
+        Mã hóa KB ∧ ¬target thành các mệnh đề số nguyên (ví dụ để ghi ra file DIMACS)
+
+        KB ⊨ target khi và chỉ khi tập mệnh đề trả về không thỏa được.
+        Bảng ký hiệu tương ứng được lưu trong self.symbol_table.
+
+        :return: ClauseStore các tuple số nguyên
+        """
+        return self._encode_database(self.invert_expression(target, negation))
+
+    def prove_by_resolution_int(self, target, **options):
+        """
+        Chứng minh bằng hợp giải trên mệnh đề số nguyên
+
+        Các mệnh đề chỉ được chuyển lại thành chuỗi khi ghi kết quả (dùng self.symbol_table).
+
+        :param options: Các tùy chọn khác của prove_by_resolution
+        :return: (proof_steps gồm các tuple số nguyên, kết quả chứng minh)
+        """
+        return self.prove_by_resolution(target, engine='int', **options)
+
+    def prove_by_cdcl(self, target, verbose=True, negation='distribute'):
+        """
+        Kiểm tra KB ⊨ target bằng cách chứng minh KB ∧ ¬target không thỏa được với bộ giải CDCL
+
+        Chỉ trả về kết quả YES/NO, không sinh các bước hợp giải.
+        Thống kê của bộ giải được lưu trong self.solver_stats.
+
+        :return: True nếu KB suy ra được target
+        """
+        negated_target = self.invert_expression(target, negation)
+        if verbose:
+            print(f"Mệnh đề phủ định: {negated_target}")
+        database = self._encode_database(negated_target)
+
+        solver = CDCLSolver(len(self.symbol_table), database)
+        satisfiable = solver.solve()
+        self.solver_stats = solver.stats()
+        if verbose:
+            print(f"CDCL: {'thỏa được' if satisfiable else 'không thỏa được'}, {self.solver_stats}")
+        return not satisfiable
+
+#--------------------------------Chiến lược given clause (hàng đợi ưu tiên)---------------------------------
+
+    @staticmethod
+    def clause_priority(clause, length_weight=1.0, unit_weight=1.0):
+        # Độ ưu tiên của mệnh đề chờ xử lý (nhỏ hơn được chọn trước): mệnh đề ngắn và mệnh đề đơn trước
+        return length_weight * len(clause) - (unit_weight if len(clause) == 1 else 0.0)
+
+    def prove_by_given_clause(self, target, engine='string', length_weight=1.0, unit_weight=1.0,
+                              budget=None, verbose=True, negation='distribute'):
+        """
+        Chứng minh bằng hợp giải theo chiến lược "given clause" thay vì theo từng vòng
+
+        Các mệnh đề chưa xử lý (ban đầu là KB và ¬α) nằm trong hàng đợi ưu tiên theo clause_priority,
+        cùng độ ưu tiên thì mệnh đề thêm vào trước được chọn trước. Mỗi bước lấy mệnh đề ưu tiên nhất,
+        hợp giải nó với mọi mệnh đề đã xử lý có literal đối ngẫu rồi chuyển nó vào tập đã xử lý;
+        các resolvent mới được đưa vào hàng đợi. Dừng ngay khi sinh ra mệnh đề rỗng ({}).
+        Khi hàng đợi rỗng, mọi cặp đã được xét nên kết quả YES/NO giống prove_by_resolution.
+
+        :param engine: 'string' hoặc 'int' (mệnh đề số nguyên, giải mã bằng self.symbol_table)
+        :param length_weight: Trọng số độ dài mệnh đề
+        :param unit_weight: Mức ưu tiên thêm cho mệnh đề đơn
+        :param budget: ResourceBudget được kiểm tra sau mỗi bước
+        :return: (các bước dạng (mệnh đề được chọn, các resolvent mới), kết quả True/False/UNKNOWN)
+        """
+        if engine not in ('string', 'int'):
+            raise ValueError(f"Chiến lược given clause chỉ hỗ trợ engine 'string' hoặc 'int': {engine}")
+        self.metrics = []
+        self.budget_exceeded = None
+        if budget is not None:
+            budget.start()
+        negated_target = self.invert_expression(target, negation)
+        if verbose:
+            print(f"Mệnh đề phủ định: {negated_target}")
+
+        database, apply, negate, decode, empty = self._refutation_database(negated_target, engine)
+        self.proof = ProofDAG(negate, decode)
+        nodes = [self.proof.add_input(clause) for clause in database]
+        processed = OccurrenceIndex(negate)
+
+        # Hàng đợi (độ ưu tiên, id mệnh đề): id tăng theo thứ tự thêm vào nên phân định các mệnh đề cùng độ ưu tiên
+        queue = [(self.clause_priority(clause, length_weight, unit_weight), clause_id)
+                 for clause_id, clause in enumerate(database)]
+        heapq.heapify(queue)
+        literals = sum(len(clause) for clause in database) if budget is not None else 0
+        steps = []
+        while queue:
+            _, given_id = heapq.heappop(queue)
+            given = database[given_id]
+            new_statements = []
+            is_proved = False
+            for j in processed.partners(given, 0):
+                for res in apply(database[j], given, database):
+                    if res == empty:
+                        self.proof.root = self.proof.add_resolvent(res, nodes[j], nodes[given_id], len(steps) + 1)
+                        new_statements.append(res)
+                        is_proved = True
+                        break
+                    if database.add(res):
+                        nodes.append(self.proof.add_resolvent(res, nodes[j], nodes[given_id], len(steps) + 1))
+                        new_statements.append(res)
+                        literals += len(res)
+                        heapq.heappush(queue, (self.clause_priority(res, length_weight, unit_weight), len(database) - 1))
+                if is_proved:
+                    break
+            processed.add(given_id, given)
+            steps.append((given, new_statements))
+            if verbose:
+                print(f"Bước {len(steps)}: Chọn {decode(given)} -> {[decode(res) for res in new_statements]}")
+            if is_proved:
+                return steps, True
+            if budget is not None and budget.check(len(database), len(new_statements), literals):
+                self.budget_exceeded = budget.exceeded
+                return steps, UNKNOWN
+        return steps, False
+
+#--------------------------------Tiền xử lý: lan truyền mệnh đề đơn---------------------------------
+
+    def propagate_units(self, clauses, negate=operator.neg):
+        """
+        Lan truyền mệnh đề đơn (unit propagation) tới điểm bất động bằng hai literal theo dõi
+
+        Mỗi mệnh đề có từ hai literal trở lên được theo dõi bởi hai literal chưa sai;
+        chỉ khi một literal theo dõi bị gán sai mới cần duyệt lại mệnh đề đó.
+
+        :param clauses: Các mệnh đề (không chứa hằng đúng)
+        :param negate: Hàm đảo literal (operator.neg với số nguyên, invert_literal với chuỗi)
+        :return: (có mâu thuẫn hay không, các literal được gán đúng, các mệnh đề đã rút gọn)
+        """
+        true_literals = set()
+        trail = []
+        watches = defaultdict(list)
+        watched = []
+
+        def assign(literal):
+            # Gán literal là đúng, trả về False nếu literal đối ngẫu đã đúng
+            if literal in true_literals:
+                return True
+            if negate(literal) in true_literals:
+                return False
+            true_literals.add(literal)
+            trail.append(literal)
+            return True
+
+        for clause_id, clause in enumerate(clauses):
+            literals = list(dict.fromkeys(clause))
+            watched.append(literals)
+            if not literals:
+                return True, trail, []
+            if len(literals) == 1:
+                if not assign(literals[0]):
+                    return True, trail, []
             else:
-                # Nếu tìm thấy mệnh đề rỗng, chứng minh thành công
-                if ['{}'] in new_statements:
-                    return proof_steps, True
+                watches[literals[0]].append(clause_id)
+                watches[literals[1]].append(clause_id)
+
+        head = 0
+        while head < len(trail):
+            false_literal = negate(trail[head])
+            head += 1
+            remaining = []
+            pending = watches.get(false_literal, [])
+            for position, clause_id in enumerate(pending):
+                literals = watched[clause_id]
+                # Đưa literal vừa bị gán sai về vị trí theo dõi thứ hai
+                if literals[0] == false_literal:
+                    literals[0], literals[1] = literals[1], literals[0]
+                if literals[0] in true_literals:
+                    remaining.append(clause_id)
+                    continue
+                # Tìm literal chưa sai khác để theo dõi thay thế
+                for k in range(2, len(literals)):
+                    if negate(literals[k]) not in true_literals:
+                        literals[1], literals[k] = literals[k], literals[1]
+                        watches[literals[1]].append(clause_id)
+                        break
                 else:
-                    # Thêm các mệnh đề mới vào cơ sở tri thức
-                    for res in new_statements:
-                        temp_kb.insert(res)
+                    remaining.append(clause_id)
+                    # Mệnh đề chỉ còn literal theo dõi thứ nhất: trở thành mệnh đề đơn
+                    if not assign(literals[0]):
+                        return True, trail, []
+            watches[false_literal] = remaining
 
+        # Rút gọn: bỏ mệnh đề đã đúng, bỏ các literal đã sai (giữ nguyên thứ tự literal)
+        simplified = []
+        for clause in clauses:
+            if any(literal in true_literals for literal in clause):
+                continue
+            simplified.append(type(clause)(literal for literal in clause if negate(literal) not in true_literals))
+        return False, trail, simplified
 
 #--------------------------------Các phương thức bổ sung để cải tiến thuật toán---------------------------------
 
@@ -1,32 +1,148 @@
 import os
+import argparse
+import contextlib
+import json
+import multiprocessing
 import KnowledgeBase as kb
 import re
+import sys
 import time
-from typing import Tuple, List
+from multiprocessing.connection import wait
+from typing import Tuple, List, Optional
+from SymbolTable import SymbolTable
+from Dimacs import read_dimacs, write_dimacs
+from KBCache import KBCache
+from QueryCache import QueryCache
+from PrimeImplicates import PrimeImplicates
+from Preprocessing import PreprocessPipeline
+from FileProfiler import FileProfiler
+from ResourceBudget import ResourceBudget, UNKNOWN
 
 
 class LogicResolver:
-    def __init__(self, input_dir: str = './input/', output_dir: str = './output/'):
+    # Literal hợp lệ: dấu - (tùy chọn) và tên biến gồm chữ cái, chữ số, dấu _ (không bắt đầu bằng chữ số)
+    LITERAL_PATTERN = re.compile(r'-?[A-Za-z_][A-Za-z0-9_]*')
+
+    def __init__(self, input_dir: str = './input/', output_dir: str = './output/', engine: str = 'string',
+                 incremental: bool = False, use_index: bool = False, subsumption: bool = False,
+                 unit_propagation: Optional[str] = None, method: str = 'resolution',
+                 preprocess: Optional[List[str]] = None, stream: bool = False,
+                 budget: Optional[ResourceBudget] = None, metrics: bool = False, quiet: bool = False,
+                 workers: int = 1, jobs: int = 1, timeout: Optional[float] = None,
+                 input_format: str = 'text', alpha: Optional[str] = None, cache_dir: Optional[str] = None,
+                 query_cache: Optional[QueryCache] = None, implicates_dir: Optional[str] = None,
+                 profile: bool = False, profile_threshold: Optional[float] = None,
+                 negation: str = 'distribute', strategy: str = 'breadth', length_weight: float = 1.0,
+                 unit_weight: float = 1.0):
         self.input_dir = input_dir
         self.output_dir = output_dir
+        # Lõi hợp giải: 'string' (mặc định), 'int' (mệnh đề số nguyên) hoặc 'numpy' (mask bit)
+        self.engine = engine
+        # Chỉ hợp giải các cặp "mới x cũ" ở mỗi vòng
+        self.incremental = incremental
+        # Dùng chỉ mục literal để chỉ thử các cặp hợp giải được
+        self.use_index = use_index
+        # Bật subsumption: thay đổi các mệnh đề được liệt kê trong file output
+        self.subsumption = subsumption
+        # Lan truyền mệnh đề đơn trước khi hợp giải: None, 'trace' hoặc 'fast' (chỉ ghi YES/NO)
+        self.unit_propagation = unit_propagation
+        # Phương pháp chứng minh: 'resolution' (ghi các bước), 'cdcl' hoặc 'implicates'
+        # (tra tập prime implicate đã biên dịch của KB), hai phương pháp sau chỉ ghi YES/NO
+        if method not in ('resolution', 'cdcl', 'implicates'):
+            raise ValueError(f"Phương pháp không hợp lệ: {method}")
+        self.method = method
+        # Các bước tiền xử lý chạy giữa bước đọc input và bước chứng minh (None: tắt)
+        self.preprocess = PreprocessPipeline(preprocess) if preprocess is not None else None
+        # Ghi từng vòng ra file ngay khi vòng đó kết thúc, không giữ toàn bộ vết trong bộ nhớ
+        self.stream = stream
+        # Giới hạn tài nguyên cho mỗi file; khi vượt giới hạn kết quả là UNKNOWN
+        self.budget = budget
+        # Ghi số liệu từng vòng ra output_XX.metrics.jsonl
+        self.metrics = metrics
+        # Tắt các dòng in từng bước hợp giải
+        self.quiet = quiet
+        # Số tiến trình hợp giải song song cho mỗi vòng
+        self.workers = workers
+        # Chế độ batch: số file xử lý song song (mỗi file một tiến trình con)
+        # và thời gian tối đa cho mỗi file (giây), quá hạn thì tiến trình bị dừng
+        self.jobs = jobs
+        self.timeout = timeout
+        # Tiến trình con của chế độ batch là tiến trình daemon (để bị dừng cùng tiến trình chính)
+        # nên không thể tạo thêm tiến trình hợp giải song song
+        if (jobs > 1 or timeout is not None) and workers > 1:
+            raise ValueError("Không thể dùng --workers > 1 cùng chế độ batch (--jobs > 1 hoặc --timeout)")
+        # Định dạng file input: 'text' (input_XX.txt) hoặc 'dimacs' (input_XX.cnf)
+        if input_format not in ('text', 'dimacs'):
+            raise ValueError(f"Định dạng input không hợp lệ: {input_format}")
+        self.input_format = input_format
+        # α cho file DIMACS (ví dụ "-3 OR 5" hoặc "-A OR B"); None: lấy từ chú thích c alpha
+        self.alpha = alpha
+        # Thư mục chứa các KB đã biên dịch (bỏ qua bước đọc và tiền xử lý khi input không đổi)
+        self.cache = KBCache(cache_dir) if cache_dir is not None else None
+        # Cache kết quả theo cặp (KB, α): file có cùng KB và α được ghi lại từ kết quả đã lưu
+        self.query_cache = query_cache
+        # Thư mục lưu tập prime implicate đã biên dịch của từng KB (phương pháp 'implicates')
+        self.implicates_dir = implicates_dir
+        self._implicates = {}
+        # Đo hiệu năng từng file (cProfile, tracemalloc), ghi output_XX.prof và output_XX.profile.txt;
+        # với profile_threshold chỉ ghi cho các file chạy (có bộ đo) lâu hơn ngưỡng đó (giây)
+        self.profile = profile or profile_threshold is not None
+        self.profile_threshold = profile_threshold
+        # Cách phủ định α nhiều mệnh đề: 'distribute' (phân phối, có thể tăng theo hàm mũ)
+        # hoặc 'tseitin' (thêm biến mới _T1, _T2, ..., kích thước tuyến tính)
+        if negation not in ('distribute', 'tseitin'):
+            raise ValueError(f"Cách phủ định α không hợp lệ: {negation}")
+        self.negation = negation
+        # Chiến lược hợp giải: 'breadth' (theo từng vòng, mặc định) hoặc 'given-clause'
+        # (hàng đợi ưu tiên theo độ dài và mệnh đề đơn với các trọng số length_weight, unit_weight)
+        if strategy not in ('breadth', 'given-clause'):
+            raise ValueError(f"Chiến lược hợp giải không hợp lệ: {strategy}")
+        if strategy == 'given-clause' and engine not in ('string', 'int'):
+            raise ValueError(f"Chiến lược given-clause chỉ hỗ trợ engine 'string' hoặc 'int': {engine}")
+        self.strategy = strategy
+        self.length_weight = length_weight
+        self.unit_weight = unit_weight
+
+    def _proof_options(self) -> dict:
+        """
+        Các tùy chọn truyền vào KnowledgeBase.prove_by_resolution
+        """
+        return {'engine': self.engine, 'incremental': self.incremental, 'use_index': self.use_index,
+                'subsumption': self.subsumption, 'unit_propagation': self.unit_propagation,
+                'budget': self.budget, 'metrics': self.metrics, 'verbose': not self.quiet,
+                'workers': self.workers, 'negation': self.negation}
+
+    def _parse_literal(self, token: str) -> str:
+        """
+        Kiểm tra một literal và intern chuỗi để các phép so sánh literal chỉ cần so sánh địa chỉ
+        """
+        if not self.LITERAL_PATTERN.fullmatch(token):
+            raise ValueError(f"Literal không hợp lệ: {token}")
+        return sys.intern(token)
 
     def _parse_input_file(self, content: List[str]) -> Tuple[kb.KnowledgeBase, List[List[str]]]:
         """
         Phân tích nội dung file input và khởi tạo Knowledge Base
+        Tên biến có thể dài nhiều ký tự (ví dụ: Rain, -is_wet, X12)
+        α ở dạng CNF: mỗi dòng trước dòng số lượng mệnh đề N là một mệnh đề của α (ví dụ A OR -B)
         """
-        # Lấy chữ cái cần query từ dòng đầu
-        query_letter = content[0]
+        # Dòng số lượng mệnh đề là dòng đầu tiên chỉ gồm chữ số (tên biến không bắt đầu bằng chữ số)
+        count_line = next((i for i, line in enumerate(content) if line.isdigit()), 1)
         
-        # Tạo query dạng list of lists
-        query = [[query_letter]]
+        # Tạo query dạng list of lists, mỗi dòng α là một mệnh đề
+        query = [[self._parse_literal(x) for x in line.split() if x != 'OR'] for line in content[:count_line]]
+        if not query or not all(query):
+            raise ValueError("α rỗng")
         
         # Khởi tạo Knowledge Base
         knowledge_base = kb.KnowledgeBase()
         
-        # Xử lý các mệnh đề từ dòng thứ 3 trở đi
-        for cnf in content[2:]:
+        # Xử lý các mệnh đề sau dòng số lượng mệnh đề
+        for cnf in content[count_line + 1:]:
             # Tách các thành phần và loại bỏ 'OR'
-            clause = [x for x in cnf.split() if x != 'OR']
+            clause = [self._parse_literal(x) for x in cnf.split() if x != 'OR']
+            if not clause:
+                raise ValueError(f"Mệnh đề rỗng trong KB: {cnf}")
             knowledge_base.insert(clause)
 
         return knowledge_base, query
@@ -36,6 +152,8 @@ class LogicResolver:
         Đọc và xử lý file input
         """
         try:
+            if self.input_format == 'dimacs':
+                return self._read_dimacs_file(filepath)
             with open(filepath, 'r', encoding='utf-8-sig') as f:
                 # Đọc và loại bỏ dòng trống
                 content = [line.strip() for line in f.read().splitlines() if line.strip()]
@@ -43,12 +161,172 @@ class LogicResolver:
         except Exception as e:
             raise Exception(f"Lỗi khi đọc file {filepath}: {str(e)}")
 
-    def _write_result(self, result: List[List[str]], is_proved: bool, filepath: str) -> None:
+    def _read_dimacs_file(self, filepath: str) -> Tuple[kb.KnowledgeBase, List[List[str]]]:
+        """
+        Đọc file DIMACS CNF (dùng mmap) và khởi tạo Knowledge Base
+        Biến có chú thích c var mang tên đó, các biến còn lại được đặt tên X1, X2, ...
+        """
+        cnf = read_dimacs(filepath)
+
+        # Mỗi literal chỉ được chuyển thành chuỗi (và intern) một lần
+        texts = {}
+
+        def literal_text(literal: int) -> str:
+            text = texts.get(literal)
+            if text is None:
+                text = texts[literal] = self._parse_literal(cnf.literal_to_text(literal))
+            return text
+
+        def alpha_text(literal: int) -> str:
+            # Biến của α (từ --alpha hay c alpha) phải nằm trong số biến đã khai báo ở dòng p cnf
+            if abs(literal) > cnf.num_vars:
+                raise ValueError(f"Literal {literal} của α vượt quá số biến đã khai báo ({cnf.num_vars})")
+            return literal_text(literal)
+
+        # α: từ tham số --alpha (số nguyên DIMACS hoặc tên biến, các mệnh đề cách nhau bởi 0 hoặc AND),
+        # nếu không có thì từ chú thích c alpha
+        if self.alpha is not None:
+            alpha = [[]]
+            for token in self.alpha.split():
+                if token in ('0', 'AND'):
+                    alpha.append([])
+                elif token == 'OR':
+                    continue
+                elif re.fullmatch(r'-?\d+', token):
+                    alpha[-1].append(alpha_text(int(token)))
+                else:
+                    alpha[-1].append(self._parse_literal(token))
+            alpha = [clause for clause in alpha if clause]
+        elif cnf.alpha is not None:
+            alpha = [[alpha_text(literal) for literal in clause] for clause in cnf.alpha]
+        else:
+            raise ValueError("File DIMACS không có α: thêm dòng 'c alpha ... 0' hoặc dùng --alpha")
+        if not alpha or not all(alpha):
+            raise ValueError("α rỗng")
+
+        knowledge_base = kb.KnowledgeBase()
+        for clause in cnf.clauses:
+            if not clause:
+                # KB chứa mệnh đề rỗng luôn mâu thuẫn, nhưng các engine hợp giải không hợp giải được
+                # trên mệnh đề rỗng nên không đưa nó vào KB (sẽ cho kết quả sai)
+                raise ValueError("File DIMACS có mệnh đề rỗng (dòng chỉ gồm 0): KB mâu thuẫn, không hỗ trợ")
+            knowledge_base.insert([literal_text(literal) for literal in clause])
+
+        return knowledge_base, alpha
+
+    def _load_knowledge_base(self, input_path: str) -> Tuple[kb.KnowledgeBase, List[List[str]]]:
+        """
+        Đọc file input và chạy các bước tiền xử lý
+        Khi có cache, KB đã biên dịch của cùng nội dung file (và cùng tùy chọn) được đọc thẳng bằng mmap
+        """
+        key = None
+        if self.cache is not None:
+            stages = [name for name, _ in self.preprocess.stages] if self.preprocess is not None else None
+            key = self.cache.key(input_path, self.input_format, self.alpha, stages)
+            loaded = self.cache.load(key)
+            if loaded is not None:
+                if not self.quiet:
+                    print(f"Đọc KB đã biên dịch: {self.cache.path(key)}")
+                return loaded
+
+        knowledge_base, query = self._read_file(input_path)
+
+        # Tiền xử lý KB (chuẩn hóa, bỏ trùng lặp, hằng đúng, literal thuần)
+        if self.preprocess is not None:
+            knowledge_base = self.preprocess.run(knowledge_base, query, self.negation)
+            for stats in self.preprocess.stats if not self.quiet else ():
+                print(f"Tiền xử lý [{stats['stage']}]: {stats['clauses_in']} -> {stats['clauses_out']} mệnh đề, "
+                      f"{stats['literals_in']} -> {stats['literals_out']} literal ({stats['seconds']:.7f} giây)")
+
+        if key is not None:
+            self.cache.store(key, knowledge_base, query)
+        return knowledge_base, query
+
+    def _prime_implicates(self, knowledge_base: kb.KnowledgeBase) -> PrimeImplicates:
+        """
+        Tập prime implicate của KB: lấy từ bộ nhớ hoặc file <khóa KB>.kbc trong implicates_dir,
+        nếu chưa có thì biên dịch (và lưu lại nếu có implicates_dir)
+        """
+        key = PrimeImplicates.kb_key(knowledge_base.database)
+        implicates = self._implicates.get(key)
+        if implicates is not None:
+            return implicates
+
+        filepath = os.path.join(self.implicates_dir, key + '.kbc') if self.implicates_dir is not None else None
+        if filepath is not None and os.path.exists(filepath):
+            implicates = PrimeImplicates.load(filepath)
+        else:
+            implicates = PrimeImplicates.compile(knowledge_base, self.budget)
+            if not self.quiet:
+                stats = implicates.stats
+                print(f"Biên dịch prime implicate: {stats['kb_clauses']} mệnh đề KB -> {stats['implicates']} prime implicate "
+                      f"({stats['literals']} literal, {stats['resolvents']} resolvent) trong {stats['seconds']:.7f} giây")
+            if filepath is not None:
+                os.makedirs(self.implicates_dir, exist_ok=True)
+                implicates.save(filepath)
+        self._implicates[key] = implicates
+        return implicates
+
+    @staticmethod
+    def _format_clause(clause, symbols: Optional[SymbolTable] = None) -> str:
+        """
+        Định dạng một mệnh đề theo cách ghi ra file output
+        Nếu có bảng ký hiệu, mệnh đề số nguyên được giải mã về chuỗi tại đây
+        """
+        if symbols is not None:
+            return symbols.format_clause(clause)
+        return ' OR '.join(clause)
+
+    @staticmethod
+    def _format_verdict(is_proved) -> str:
+        """
+        Dòng kết quả cuối file output: YES, NO hoặc UNKNOWN (hết ngân sách tài nguyên)
+        """
+        if is_proved == UNKNOWN:
+            return UNKNOWN
+        return 'YES' if is_proved else 'NO'
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _open_atomic(filepath: str):
+        """
+        Mở file tạm cạnh filepath để ghi, đổi tên thành filepath khi ghi xong
+        File output không bao giờ bị ghi dở (kể cả khi tiến trình bị dừng giữa chừng)
+        """
+        temp_path = filepath + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                yield f
+            os.replace(temp_path, filepath)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _mark_failed(self, input_filename: str, marker: str) -> None:
+        """
+        Thay kết quả cũ của một file bị lỗi hoặc quá thời gian bằng file output chỉ gồm marker
+        ('ERROR' hoặc 'TIMEOUT'), xóa file tạm đang ghi dở và số liệu, hồ sơ hiệu năng của lần chạy trước
+        """
+        output_path = os.path.join(self.output_dir, self._generate_output_filename(input_filename))
+        prefix = output_path[:-len('.txt')]
+        try:
+            for path in (output_path, prefix + '.metrics.jsonl', prefix + '.prof', prefix + '.profile.txt'):
+                for stale in (path + '.tmp', path):
+                    if os.path.exists(stale):
+                        os.remove(stale)
+            with self._open_atomic(output_path) as f:
+                f.write(marker + '\n')
+        except OSError as e:
+            print(f"Lỗi khi ghi file {output_path}: {str(e)}")
+
+    def _write_result(self, result: List[List[str]], is_proved: bool, filepath: str,
+                      symbols: Optional[SymbolTable] = None) -> None:
         """
         Ghi kết quả ra file output
         """
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
+            with self._open_atomic(filepath) as f:
                 # Ghi từng bước hợp giải
                 for step_results in result:
                     # Ghi số lượng mệnh đề trong bước
@@ -56,11 +334,66 @@ class LogicResolver:
                     
                     # Ghi từng mệnh đề
                     for clause in step_results:
-                        clause_str = ' OR '.join(clause)
-                        f.write(f"{clause_str}\n")
+                        f.write(f"{self._format_clause(clause, symbols)}\n")
                     
                 # Ghi kết quả cuối cùng
-                f.write('YES' if is_proved else 'NO')
+                f.write(self._format_verdict(is_proved))
+        except Exception as e:
+            raise Exception(f"Lỗi khi ghi file {filepath}: {str(e)}")
+
+    def _write_stream(self, knowledge_base: kb.KnowledgeBase, query: List[List[str]],
+                      filepath: str) -> Tuple[bool, int]:
+        """
+        Chứng minh và ghi nối từng vòng vào file output ngay khi vòng đó kết thúc
+        (vào file tạm, đổi tên khi xong). File thu được giống hệt file do _write_result ghi
+
+        :return: (kết quả chứng minh, số mệnh đề đã ghi)
+        """
+        rounds = knowledge_base.prove_by_resolution_stream(query, record_path=False, **self._proof_options())
+        try:
+            with self._open_atomic(filepath) as f:
+                is_proved = False
+                derived = 0
+                for step_results, is_proved in rounds:
+                    if step_results is None:
+                        continue
+                    derived += len(step_results)
+                    # Bảng ký hiệu chỉ có sau khi generator đã mã hóa KB
+                    symbols = knowledge_base.symbol_table
+                    f.write(f"{len(step_results)}\n")
+                    for clause in step_results:
+                        f.write(f"{self._format_clause(clause, symbols)}\n")
+                    f.flush()
+                f.write(self._format_verdict(is_proved))
+            return is_proved, derived
+        except OSError as e:
+            raise Exception(f"Lỗi khi ghi file {filepath}: {str(e)}")
+
+    def _write_given_clause(self, steps: List[Tuple[list, list]], is_proved, filepath: str,
+                            symbols: Optional[SymbolTable] = None) -> None:
+        """
+        Ghi kết quả của chiến lược given-clause: mỗi bước gồm dòng "GIVEN <mệnh đề được chọn>",
+        số lượng resolvent mới và các resolvent đó; dòng cuối là kết quả
+        """
+        try:
+            with self._open_atomic(filepath) as f:
+                for given, new_statements in steps:
+                    f.write(f"GIVEN {self._format_clause(given, symbols)}\n")
+                    f.write(f"{len(new_statements)}\n")
+                    for clause in new_statements:
+                        f.write(f"{self._format_clause(clause, symbols)}\n")
+                f.write(self._format_verdict(is_proved))
+        except Exception as e:
+            raise Exception(f"Lỗi khi ghi file {filepath}: {str(e)}")
+
+    def _write_metrics(self, metrics: List[dict], filepath: str) -> None:
+        """
+        Ghi số liệu của từng vòng hợp giải, mỗi vòng một dòng JSON
+        """
+        try:
+            with self._open_atomic(filepath) as f:
+                for round_metrics in metrics:
+                    f.write(json.dumps(round_metrics, ensure_ascii=False) + '\n')
         except Exception as e:
             raise Exception(f"Lỗi khi ghi file {filepath}: {str(e)}")
 
@@ -69,9 +402,10 @@ class LogicResolver:
         Lấy danh sách file input đã sắp xếp
         """
         try:
+            extension = '.cnf' if self.input_format == 'dimacs' else '.txt'
             files = [f for f in os.listdir(self.input_dir) 
-                    if f.startswith('input_') and f.endswith('.txt')]
-            return sorted(files, key=lambda x: int(re.search(r'input_(\d+)\.txt', x).group(1)))
+                    if f.startswith('input_') and f.endswith(extension)]
+            return sorted(files, key=lambda x: int(re.search(r'input_(\d+)\.(txt|cnf)', x).group(1)))
         except Exception as e:
             raise Exception(f"Lỗi khi đọc thư mục input: {str(e)}")
 
@@ -79,31 +413,110 @@ class LogicResolver:
         """
         Tạo tên file output tương ứng với file input
         """
-        match = re.search(r'input_(\d+)\.txt', input_filename)
+        match = re.search(r'input_(\d+)\.(txt|cnf)', input_filename)
         if not match:
             raise ValueError(f"Tên file không đúng định dạng: {input_filename}")
         return f'output_{match.group(1)}.txt'
 
-    def process_single_file(self, input_filename: str) -> None:
+    @staticmethod
+    def _summary(input_filename: str, status: str, verdict: str = '-', seconds: float = 0.0,
+                 kb_clauses: int = 0, derived_clauses: int = 0, error: str = '') -> dict:
+        """
+        Tóm tắt kết quả xử lý một file: status là 'ok', 'unknown', 'error' hoặc 'timeout'
+        """
+        return {'file': input_filename, 'status': status, 'verdict': verdict, 'seconds': seconds,
+                'kb_clauses': kb_clauses, 'derived_clauses': derived_clauses, 'error': error}
+
+    def process_single_file(self, input_filename: str) -> dict:
         """
         Xử lý một file input đơn lẻ và đo thời gian xử lý
+        (ở chế độ profile, ghi thêm hồ sơ hiệu năng cạnh file output)
+
+        :return: Tóm tắt kết quả (xem _summary)
+        """
+        if not self.profile:
+            return self._process_file(input_filename)
+
+        with FileProfiler() as profiler:
+            summary = self._process_file(input_filename)
+        if self.profile_threshold is None or profiler.seconds >= self.profile_threshold:
+            try:
+                output_path = os.path.join(self.output_dir, self._generate_output_filename(input_filename))
+                prof_path, text_path = profiler.save(output_path[:-len('.txt')], f"File {input_filename}")
+                print(f"Đã ghi hồ sơ hiệu năng: {prof_path}, {text_path} "
+                      f"(bộ nhớ đỉnh {profiler.peak_bytes / 1024:.1f} KB)")
+            except Exception as e:
+                print(f"Lỗi khi ghi hồ sơ hiệu năng của file {input_filename}: {str(e)}")
+        return summary
+
+    def _process_file(self, input_filename: str) -> dict:
+        """
+        Đọc, chứng minh và ghi kết quả của một file input
         """
+        # Bắt đầu tính thời gian
+        start_time = time.time()
         try:
             # Đường dẫn đầy đủ cho input và output
             input_path = os.path.join(self.input_dir, input_filename)
             output_path = os.path.join(self.output_dir, self._generate_output_filename(input_filename))
 
-            # Bắt đầu tính thời gian
-            start_time = time.time()
-
-            # Đọc và xử lý file
-            knowledge_base, query = self._read_file(input_path)
+            # Đọc, tiền xử lý file (hoặc đọc KB đã biên dịch từ cache)
+            knowledge_base, query = self._load_knowledge_base(input_path)
             
-            # Thực hiện hợp giải
-            result, is_proved = knowledge_base.prove_by_resolution(query)
+            # Tìm kết quả trong cache truy vấn (phương pháp cdcl, implicates chỉ cần YES/NO, không cần vết;
+            # vết của chiến lược given-clause có định dạng riêng nên không dùng cache)
+            trace = self.method == 'resolution'
+            given_clause = trace and self.strategy == 'given-clause'
+            query_cache = self.query_cache if not given_clause else None
+            cached = None
+            if query_cache is not None:
+                cached = query_cache.lookup(knowledge_base.database, query, self._proof_options(), trace)
+
+            # Thực hiện chứng minh
+            if cached is not None:
+                result, is_proved = cached
+                if result is None:
+                    result = []
+            elif self.method == 'cdcl':
+                result, is_proved = [], knowledge_base.prove_by_cdcl(query, verbose=not self.quiet,
+                                                                     negation=self.negation)
+            elif self.method == 'implicates':
+                result, is_proved = [], self._prime_implicates(knowledge_base).entails(query)
+            elif given_clause:
+                # Các bước given-clause được ghi theo định dạng riêng
+                result = None
+                steps, is_proved = knowledge_base.prove_by_given_clause(
+                    query, engine=self.engine, length_weight=self.length_weight, unit_weight=self.unit_weight,
+                    budget=self.budget, verbose=not self.quiet, negation=self.negation)
+                derived = sum(len(new_statements) for _, new_statements in steps)
+                self._write_given_clause(steps, is_proved, output_path, knowledge_base.symbol_table)
+            elif self.stream:
+                # Các vòng đã được ghi trong lúc chứng minh
+                result = None
+                is_proved, derived = self._write_stream(knowledge_base, query, output_path)
+            else:
+                result, is_proved = knowledge_base.prove_by_resolution(query, **self._proof_options())
             
-            # Ghi kết quả
-            self._write_result(result, is_proved, output_path)
+            # Ghi kết quả (kết quả lấy từ cache đã ở dạng chuỗi)
+            symbols = knowledge_base.symbol_table if cached is None else None
+            if result is not None:
+                derived = sum(len(step_results) for step_results in result)
+                self._write_result(result, is_proved, output_path, symbols)
+
+            # Lưu kết quả vào cache truy vấn (chế độ stream không giữ các vòng nên chỉ lưu YES/NO)
+            if query_cache is not None and cached is None:
+                rounds = query_cache.decode_rounds(result, symbols) if trace and result is not None else None
+                query_cache.store(knowledge_base.database, query, is_proved, rounds, self._proof_options())
+
+            # Số liệu từng vòng (chỉ phương pháp resolution có vòng hợp giải, kết quả từ cache không chạy lại)
+            if self.metrics and trace and not given_clause and cached is None:
+                self._write_metrics(knowledge_base.metrics, output_path[:-len('.txt')] + '.metrics.jsonl')
+
+            # Hết ngân sách: báo giới hạn đã bị vượt rồi chuyển sang file tiếp theo
+            if is_proved == UNKNOWN:
+                exceeded = knowledge_base.budget_exceeded
+                print(f"File {input_filename}: vượt giới hạn {exceeded['limit']} "
+                      f"({exceeded['value']:.7g} > {exceeded['max']}), kết quả UNKNOWN")
 
             # Kết thúc tính thời gian
             end_time = time.time()
@@ -111,22 +524,222 @@ class LogicResolver:
             # Tính toán thời gian chạy
             elapsed_time = end_time - start_time
             print(f"Đã xử lý thành công file {input_filename} trong {elapsed_time:.7f} giây")
+            return self._summary(input_filename, 'unknown' if is_proved == UNKNOWN else 'ok',
+                                 self._format_verdict(is_proved), elapsed_time,
+                                 len(knowledge_base.database), derived)
             
         except Exception as e:
             print(f"Lỗi khi xử lý file {input_filename}: {str(e)}")
+            self._mark_failed(input_filename, 'ERROR')
+            return self._summary(input_filename, 'error', seconds=time.time() - start_time, error=str(e))
 
-    def process_all_files(self) -> None:
+    def process_all_files(self) -> List[dict]:
         """
         Xử lý tất cả các file trong thư mục input
+
+        :return: Danh sách tóm tắt kết quả theo thứ tự file
         """
         input_files = self._get_sorted_input_files()
         
         if not input_files:
             print("Không tìm thấy file input nào!")
-            return
+            return []
 
-        for filename in input_files:
-            self.process_single_file(filename)
+        # Chế độ batch: mỗi file chạy trong một tiến trình con để có thể dừng khi quá thời gian
+        if self.jobs > 1 or self.timeout is not None:
+            summaries = self._process_batch(input_files)
+            self._print_summary(summaries)
+            return summaries
+
+        summaries = [self.process_single_file(filename) for filename in input_files]
+        if self.query_cache is not None and not self.quiet:
+            stats = self.query_cache.stats()
+            print(f"Cache truy vấn: {stats['hits']} hit, {stats['misses']} miss, {stats['entries']} mục, "
+                  f"{stats['evictions']} mục bị loại")
+        return summaries
+
+    def export_dimacs(self, input_filename: str, export_dir: str) -> str:
+        """
+        Ghi KB ∧ ¬α của một file input ra file DIMACS CNF (input_XX.cnf trong export_dir)
+        để so sánh với các bộ giải SAT bên ngoài: KB ⊨ α khi và chỉ khi file không thỏa được.
+        Tên biến được ghi trong các chú thích c var, α trong chú thích c alpha.
+
+        :return: Đường dẫn file đã ghi
+        """
+        knowledge_base, query = self._read_file(os.path.join(self.input_dir, input_filename))
+        clauses = knowledge_base.encode_refutation(query, self.negation)
+        symbols = knowledge_base.symbol_table
+
+        match = re.search(r'input_(\d+)\.(txt|cnf)', input_filename)
+        filepath = os.path.join(export_dir, f'input_{match.group(1)}.cnf')
+        try:
+            with self._open_atomic(filepath) as f:
+                write_dimacs(f, len(symbols), clauses, names=symbols.names,
+                             alpha=[symbols.encode_clause(clause) for clause in query],
+                             comments=[f"KB ∧ ¬α của {input_filename}"])
+        except Exception as e:
+            raise Exception(f"Lỗi khi ghi file {filepath}: {str(e)}")
+        return filepath
+
+    def export_all_dimacs(self, export_dir: str) -> List[str]:
+        """
+        Ghi tất cả các file input ra định dạng DIMACS CNF
+
+        :return: Danh sách đường dẫn các file đã ghi
+        """
+        os.makedirs(export_dir, exist_ok=True)
+        exported = []
+        for filename in self._get_sorted_input_files():
+            filepath = self.export_dimacs(filename, export_dir)
+            print(f"Đã ghi {filepath}")
+            exported.append(filepath)
+        return exported
+
+    def _process_batch(self, input_files: List[str]) -> List[dict]:
+        """
+        Xử lý các file bằng tối đa self.jobs tiến trình con cùng lúc,
+        dừng các tiến trình chạy quá self.timeout giây
+        """
+        context = multiprocessing.get_context()
+        pending = list(input_files)
+        # Đầu đọc kết quả -> (tên file, tiến trình, thời điểm bắt đầu)
+        running = {}
+        summaries = {}
+        while pending or running:
+            while pending and len(running) < self.jobs:
+                filename = pending.pop(0)
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(target=process_file_worker, args=(self, filename, sender), daemon=True)
+                process.start()
+                sender.close()
+                running[receiver] = (filename, process, time.time())
+
+            # Chờ tới khi có tiến trình xong hoặc tới hạn gần nhất
+            wait_time = None
+            if self.timeout is not None:
+                earliest = min(started for _, _, started in running.values())
+                wait_time = max(earliest + self.timeout - time.time(), 0)
+            for receiver in wait(list(running), wait_time):
+                filename, process, started = running.pop(receiver)
+                try:
+                    summaries[filename] = receiver.recv()
+                except EOFError:
+                    self._mark_failed(filename, 'ERROR')
+                    summaries[filename] = self._summary(filename, 'error', seconds=time.time() - started,
+                                                        error="Tiến trình con kết thúc bất thường")
+                receiver.close()
+                process.join()
+
+            # Dừng các tiến trình quá hạn, thay kết quả cũ (và file tạm đang ghi dở) bằng TIMEOUT
+            now = time.time()
+            for receiver, (filename, process, started) in list(running.items()):
+                if self.timeout is not None and now - started >= self.timeout:
+                    process.terminate()
+                    process.join()
+                    receiver.close()
+                    del running[receiver]
+                    self._mark_failed(filename, 'TIMEOUT')
+                    summaries[filename] = self._summary(filename, 'timeout', seconds=now - started,
+                                                        error=f"Quá thời gian {self.timeout} giây")
+        return [summaries[filename] for filename in input_files]
+
+    @staticmethod
+    def _print_summary(summaries: List[dict]) -> None:
+        """
+        In bảng tóm tắt kết quả của chế độ batch
+        """
+        header = f"{'File':<16}{'Trạng thái':<12}{'Kết quả':<10}{'Thời gian (s)':>15}{'Mệnh đề KB':>12}{'Sinh ra':>10}"
+        print(header)
+        print('-' * len(header))
+        for summary in summaries:
+            print(f"{summary['file']:<16}{summary['status']:<12}{summary['verdict']:<10}"
+                  f"{summary['seconds']:>15.4f}{summary['kb_clauses']:>12}{summary['derived_clauses']:>10}")
+        for summary in summaries:
+            if summary['error']:
+                print(f"{summary['file']}: {summary['error']}")
+        counts = {}
+        for summary in summaries:
+            counts[summary['status']] = counts.get(summary['status'], 0) + 1
+        print(', '.join(f"{status}: {count}" for status, count in sorted(counts.items())))
+
+
+def process_file_worker(resolver: LogicResolver, input_filename: str, sender) -> None:
+    """
+    Hàm chạy trong tiến trình con của chế độ batch: xử lý một file (không in ra console)
+    và gửi tóm tắt kết quả về tiến trình chính
+    """
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        summary = resolver.process_single_file(input_filename)
+    sender.send(summary)
+    sender.close()
+
+
+def parse_args():
+    """
+    Đọc các tham số dòng lệnh
+    """
+    parser = argparse.ArgumentParser(description="PL Resolution")
+    parser.add_argument('--input-dir', default='./input/', help="Thư mục chứa các file input")
+    parser.add_argument('--output-dir', default='./output/', help="Thư mục ghi các file output")
+    parser.add_argument('--engine', choices=['string', 'int', 'numpy'], default='string',
+                        help="Lõi hợp giải: 'string', 'int' (mệnh đề số nguyên) hoặc 'numpy' (mask bit, vector hóa)")
+    parser.add_argument('--method', choices=['resolution', 'cdcl', 'implicates'], default='resolution',
+                        help="Phương pháp chứng minh: 'resolution', 'cdcl' (bộ giải SAT) hoặc 'implicates' "
+                             "(tra tập prime implicate đã biên dịch), hai phương pháp sau chỉ ghi YES/NO")
+    parser.add_argument('--implicates-dir', metavar='DIR', default=None,
+                        help="Thư mục lưu tập prime implicate đã biên dịch của các KB (phương pháp implicates)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Chỉ hợp giải các cặp có ít nhất một mệnh đề mới ở vòng trước")
+    parser.add_argument('--index', action='store_true',
+                        help="Dùng chỉ mục literal, chỉ thử các cặp có literal đối ngẫu")
+    parser.add_argument('--subsumption', action='store_true',
+                        help="Bật forward/backward subsumption (các mệnh đề được liệt kê sẽ khác mặc định)")
+    parser.add_argument('--unit-propagation', choices=['trace', 'fast'], default=None,
+                        help="Lan truyền mệnh đề đơn trước khi hợp giải; 'fast' chỉ ghi YES/NO")
+    parser.add_argument('--stream', action='store_true',
+                        help="Ghi từng vòng hợp giải ra file ngay khi vòng đó kết thúc")
+    parser.add_argument('--max-seconds', type=float, default=None, help="Giới hạn thời gian hợp giải mỗi file (giây)")
+    parser.add_argument('--max-clauses', type=int, default=None, help="Giới hạn tổng số mệnh đề")
+    parser.add_argument('--max-round-clauses', type=int, default=None, help="Giới hạn số mệnh đề mới trong một vòng")
+    parser.add_argument('--max-memory-mb', type=float, default=None, help="Giới hạn bộ nhớ ước lượng của các mệnh đề (MB)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Số tiến trình hợp giải song song mỗi vòng (engine string/int)")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Chế độ batch: số file xử lý song song, mỗi file một tiến trình con")
+    parser.add_argument('--timeout', type=float, default=None,
+                        help="Chế độ batch: thời gian tối đa cho mỗi file (giây), quá hạn thì dừng tiến trình")
+    parser.add_argument('--metrics', action='store_true',
+                        help="Ghi số liệu từng vòng hợp giải ra output_XX.metrics.jsonl")
+    parser.add_argument('--quiet', action='store_true', help="Không in từng bước hợp giải ra console")
+    parser.add_argument('--format', choices=['text', 'dimacs'], default='text',
+                        help="Định dạng file input: 'text' (input_XX.txt) hoặc 'dimacs' (input_XX.cnf)")
+    parser.add_argument('--alpha', default=None,
+                        help="α cho file DIMACS, ví dụ \"-3 OR 5\" (mặc định: chú thích 'c alpha ... 0' trong file)")
+    parser.add_argument('--export-dimacs', metavar='DIR', default=None,
+                        help="Ghi KB ∧ ¬α của từng file input ra DIR/input_XX.cnf thay vì chứng minh")
+    parser.add_argument('--cache', metavar='DIR', default=None,
+                        help="Lưu KB đã biên dịch (nhị phân) vào DIR, các lần chạy sau đọc lại bằng mmap nếu input không đổi")
+    parser.add_argument('--query-cache', metavar='N', type=int, default=None,
+                        help="Cache LRU tối đa N kết quả theo cặp (KB, α) đã chuẩn hóa")
+    parser.add_argument('--query-cache-max-trace', metavar='M', type=int, default=None,
+                        help="Giới hạn tổng số mệnh đề của các vết hợp giải được giữ trong cache truy vấn")
+    parser.add_argument('--preprocess', nargs='?', const='canonicalize,dedup,tautology,pure', default=None,
+                        help="Các bước tiền xử lý cách nhau bởi dấu phẩy (mặc định: canonicalize,dedup,tautology,pure)")
+    parser.add_argument('--negation', choices=['distribute', 'tseitin'], default='distribute',
+                        help="Cách phủ định α nhiều mệnh đề: 'distribute' (phân phối) hoặc 'tseitin' "
+                             "(thêm biến mới, kích thước tuyến tính)")
+    parser.add_argument('--strategy', choices=['breadth', 'given-clause'], default='breadth',
+                        help="Chiến lược hợp giải: 'breadth' (theo từng vòng) hoặc 'given-clause' "
+                             "(hàng đợi ưu tiên, dừng ngay khi có {}, ghi vết theo định dạng riêng)")
+    parser.add_argument('--length-weight', type=float, default=1.0,
+                        help="given-clause: trọng số độ dài mệnh đề trong độ ưu tiên")
+    parser.add_argument('--unit-weight', type=float, default=1.0,
+                        help="given-clause: mức ưu tiên thêm cho mệnh đề đơn")
+    parser.add_argument('--profile', action='store_true',
+                        help="Đo hiệu năng từng file (cProfile, tracemalloc), ghi output_XX.prof và output_XX.profile.txt")
+    parser.add_argument('--profile-threshold', metavar='SECONDS', type=float, default=None,
+                        help="Chỉ ghi hồ sơ hiệu năng cho các file chạy lâu hơn SECONDS giây (bật --profile)")
+    return parser.parse_args()
 
 
 def main():
@@ -134,8 +747,35 @@ def main():
     Hàm main điều khiển luồng chính của chương trình
     """
     try:
+        args = parse_args()
+
+        # Ngân sách tài nguyên (chỉ tạo khi có ít nhất một giới hạn)
+        limits = (args.max_seconds, args.max_clauses, args.max_round_clauses, args.max_memory_mb)
+        budget = ResourceBudget(*limits) if any(limit is not None for limit in limits) else None
+
+        # Cache kết quả truy vấn (chỉ tạo khi được yêu cầu)
+        query_cache = None
+        if args.query_cache is not None:
+            query_cache = QueryCache(args.query_cache, args.query_cache_max_trace)
+
         # Khởi tạo resolver
-        resolver = LogicResolver()
+        resolver = LogicResolver(args.input_dir, args.output_dir, engine=args.engine,
+                                 incremental=args.incremental, use_index=args.index,
+                                 subsumption=args.subsumption, unit_propagation=args.unit_propagation,
+                                 method=args.method,
+                                 preprocess=args.preprocess.split(',') if args.preprocess else None,
+                                 stream=args.stream, budget=budget, metrics=args.metrics, quiet=args.quiet,
+                                 workers=args.workers, jobs=args.jobs, timeout=args.timeout,
+                                 input_format=args.format, alpha=args.alpha, cache_dir=args.cache,
+                                 query_cache=query_cache, implicates_dir=args.implicates_dir,
+                                 profile=args.profile, profile_threshold=args.profile_threshold,
+                                 negation=args.negation, strategy=args.strategy,
+                                 length_weight=args.length_weight, unit_weight=args.unit_weight)
+
+        if args.export_dimacs is not None:
+            resolver.export_all_dimacs(args.export_dimacs)
+            print("Hoàn thành ghi các file DIMACS!")
+            return
         
         # Xử lý tất cả các file
         resolver.process_all_files()
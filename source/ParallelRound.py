@@ -0,0 +1,249 @@
+import functools
+import operator
+import os
+import pickle
+import shutil
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import KnowledgeBase as kb
+from ClauseStore import ClauseStore
+from ResourceBudget import ResourceBudget
+
+
+# Các bộ đếm số liệu được tính trong tiến trình con (xem KnowledgeBase._apply_counted)
+COUNTER_KEYS = ('pairs', 'complementary', 'tautologies', 'duplicates')
+
+
+def resolve_rows(database, lo, hi, start, alive, apply, counters=None, budget=None):
+    """
+    Hợp giải các cặp (i, j) với lo <= i < hi theo đúng thứ tự của candidate_pairs
+
+    :param budget: ResourceBudget, hết thời gian thì dừng sớm (budget.exceeded cho biết giới hạn)
+    :return: Generator các bộ (i, j, resolvent) khác rỗng
+    """
+    size = len(database)
+    index = database.index
+    count = 0
+    for i in range(lo, hi):
+        if alive is not None and not alive[i]:
+            continue
+        lower = max(i + 1, start)
+        partners = range(lower, size) if index is None else index.partners(database[i], lower)
+        for j in partners:
+            if alive is not None and not alive[j]:
+                continue
+            count += 1
+            if budget is not None and count % budget.CHECK_INTERVAL == 0 and budget.check_time():
+                return
+            if counters is not None:
+                counters['pairs'] += 1
+            resolvent = apply(database[i], database[j], database)
+            if resolvent:
+                yield i, j, resolvent
+
+
+# Trạng thái của tiến trình con, giữ qua các vòng và các khối: KB đã dựng lại từ file nhật ký
+_worker_state = None
+
+
+def _sync_worker(engine, log_path, offset, use_index):
+    """
+    Cập nhật KB của tiến trình con tới vị trí offset của file nhật ký
+
+    Tiến trình chính ghi vào nhật ký, mỗi vòng một lần, các mệnh đề mới và id các mệnh đề bị loại
+    (subsumption) kể từ vòng trước; tiến trình con chỉ đọc phần chưa đọc nên KB và chỉ mục literal
+    được dựng một lần cho mỗi tiến trình thay vì một lần cho mỗi khối.
+    """
+    global _worker_state
+    state = _worker_state
+    if state is None or state['log_path'] != log_path:
+        knowledge_base = kb.KnowledgeBase()
+        if engine == 'string':
+            apply, negate, empty = knowledge_base.apply_resolution, knowledge_base.invert_literal, ['{}']
+        else:
+            apply, negate, empty = knowledge_base.apply_resolution_int, operator.neg, ()
+        database = ClauseStore()
+        if use_index:
+            database.enable_index(negate)
+        state = _worker_state = {'log_path': log_path, 'offset': 0, 'knowledge_base': knowledge_base,
+                                 'apply': apply, 'negate': negate, 'empty': empty,
+                                 'database': database, 'alive': []}
+    if state['offset'] < offset:
+        database, alive = state['database'], state['alive']
+        with open(log_path, 'rb') as f:
+            f.seek(state['offset'])
+            while f.tell() < offset:
+                clauses, retired = pickle.load(f)
+                for clause in clauses:
+                    database.append(clause)
+                alive.extend([True] * len(clauses))
+                for clause_id in retired:
+                    alive[clause_id] = False
+        state['offset'] = offset
+    return state
+
+
+def resolve_shard(engine, log_path, offset, lo, hi, start, use_alive, use_index, metrics, max_seconds=None):
+    """
+    Hàm chạy trong tiến trình con: cập nhật KB của vòng hiện tại từ nhật ký rồi hợp giải một khối hàng
+
+    :param use_alive: Dùng cờ còn sống của các mệnh đề (khi bật subsumption)
+    :param max_seconds: Thời gian còn lại của ngân sách (giây), None nếu không giới hạn
+    :return: (danh sách (i, j, resolvent, số liệu), Counter số liệu hoặc None, True nếu dừng sớm vì hết thời gian);
+             số liệu của mỗi resolvent là giá trị các bộ đếm COUNTER_KEYS ngay khi nó được sinh ra (None nếu không đếm)
+    """
+    state = _sync_worker(engine, log_path, offset, use_index)
+    apply = state['apply']
+    counters = None
+    if metrics:
+        counters = Counter()
+        apply = functools.partial(state['knowledge_base']._apply_counted, apply, state['negate'], state['empty'],
+                                  counters=counters)
+    budget = None
+    if max_seconds is not None:
+        budget = ResourceBudget(max_seconds=max_seconds)
+        budget.start()
+    alive = state['alive'] if use_alive else None
+    results = [(i, j, resolvent, tuple(counters[key] for key in COUNTER_KEYS) if counters is not None else None)
+               for i, j, resolvent in resolve_rows(state['database'], lo, hi, start, alive, apply, counters, budget)]
+    return results, counters, budget is not None and budget.exceeded is not None
+
+
+class ParallelRoundExecutor:
+    """
+    Chia các cặp của một vòng hợp giải theo khối hàng i liên tiếp cho một ProcessPoolExecutor
+
+    Mỗi khối trả về các resolvent theo thứ tự cặp, các khối được ghép lại theo thứ tự hàng
+    nên kết quả (và file output) giống hệt khi chạy tuần tự. Vòng có ít cặp được chạy
+    ngay trong tiến trình chính vì chi phí gửi KB sang tiến trình con lớn hơn lợi ích.
+    KB được gửi qua một file nhật ký chỉ ghi thêm (xem _sync_worker): mỗi vòng song song chỉ ghi
+    các mệnh đề mới, mỗi khối chỉ mang theo vị trí cuối của nhật ký.
+    """
+
+    # Số khối cho mỗi tiến trình (để cân bằng tải) và số cặp tối thiểu để chạy song song
+    SHARDS_PER_WORKER = 4
+    MIN_PARALLEL_PAIRS = 20000
+
+    def __init__(self, engine, workers, apply):
+        if engine not in ('string', 'int'):
+            raise ValueError(f"Engine {engine} không hỗ trợ chạy song song")
+        self.engine = engine
+        self.workers = workers
+        # Hàm hợp giải dùng cho các vòng nhỏ chạy trong tiến trình chính
+        self.apply = apply
+        self.pool = None
+        # File nhật ký KB cho các tiến trình con, số mệnh đề đã ghi và cờ còn sống tương ứng
+        self.log_dir = None
+        self.log = None
+        self.logged = 0
+        self.logged_alive = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+        if self.log_dir is not None:
+            shutil.rmtree(self.log_dir, ignore_errors=True)
+            self.log_dir = None
+
+    def sync_log(self, database, alive):
+        """
+        Ghi vào nhật ký các mệnh đề mới của database và các mệnh đề bị loại kể từ lần ghi trước
+
+        :return: (đường dẫn nhật ký, vị trí cuối nhật ký)
+        """
+        if self.log is None:
+            self.log_dir = tempfile.mkdtemp(prefix='resolution-')
+            self.log = open(os.path.join(self.log_dir, 'kb.log'), 'wb')
+        retired = []
+        if alive is not None:
+            # Mệnh đề mới được tiến trình con coi là còn sống, cần ghi cả các mệnh đề mới đã bị loại
+            retired = [clause_id for clause_id in range(len(database))
+                       if not alive[clause_id] and (clause_id >= self.logged or self.logged_alive[clause_id])]
+            self.logged_alive = list(alive)
+        pickle.dump((database[self.logged:], retired), self.log, protocol=pickle.HIGHEST_PROTOCOL)
+        self.log.flush()
+        self.logged = len(database)
+        return self.log.name, self.log.tell()
+
+    def shards(self, size, start):
+        """
+        Chia các hàng [0, size) thành các khối liên tiếp có số cặp xấp xỉ nhau
+
+        :return: (danh sách (lo, hi), tổng số cặp)
+        """
+        weights = [max(size - max(i + 1, start), 0) for i in range(size)]
+        total = sum(weights)
+        count = self.workers * self.SHARDS_PER_WORKER
+        bounds = []
+        lo = 0
+        accumulated = 0
+        for i, weight in enumerate(weights):
+            accumulated += weight
+            if accumulated * count >= total * (len(bounds) + 1) and i + 1 < size:
+                bounds.append((lo, i + 1))
+                lo = i + 1
+        bounds.append((lo, size))
+        return bounds, total
+
+    def resolve_round(self, database, start, alive, counters=None, budget=None):
+        """
+        Hợp giải một vòng, cùng giao diện với KnowledgeBase._resolve_round
+
+        Khi có giới hạn thời gian, mỗi tiến trình con nhận thời gian còn lại và tự dừng khi hết;
+        các khối sau khối bị dừng sớm bị bỏ qua như khi chạy tuần tự.
+        Bộ đếm được cộng dần theo từng resolvent đã sinh ra, nên khi vòng bị ngân sách cắt ngang
+        (generator bị đóng giữa chừng) số liệu chỉ tính các cặp tới resolvent cuối cùng đã dùng, như khi chạy tuần tự.
+
+        :return: Generator các bộ (i, j, resolvent) khác rỗng theo thứ tự cặp
+        """
+        size = len(database)
+        bounds, total = self.shards(size, start)
+        if total < self.MIN_PARALLEL_PAIRS:
+            yield from resolve_rows(database, 0, size, start, alive, self.apply, counters, budget)
+            return
+
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        max_seconds = None
+        if budget is not None and budget.limits['max_seconds'] is not None:
+            max_seconds = budget.limits['max_seconds'] - budget.elapsed()
+        log_path, offset = self.sync_log(database, alive)
+        futures = [self.pool.submit(resolve_shard, self.engine, log_path, offset, lo, hi, start, alive is not None,
+                                    database.index is not None, counters is not None, max_seconds)
+                   for lo, hi in bounds]
+        try:
+            # Ghép kết quả theo thứ tự khối để giữ đúng thứ tự tuần tự
+            for future in futures:
+                if budget is not None and budget.check_time():
+                    return
+                results, shard_counters, truncated = future.result()
+                counted = (0,) * len(COUNTER_KEYS)
+                for i, j, resolvent, snapshot in results:
+                    if counters is not None:
+                        for key, value, previous in zip(COUNTER_KEYS, snapshot, counted):
+                            counters[key] += value - previous
+                        counted = snapshot
+                    yield i, j, resolvent
+                if counters is not None:
+                    # Các cặp sau resolvent cuối cùng của khối
+                    for key, previous in zip(COUNTER_KEYS, counted):
+                        counters[key] += shard_counters[key] - previous
+                if truncated:
+                    # Tiến trình con hết thời gian: ghi nhận giới hạn bị vượt ở tiến trình chính
+                    budget.check_time()
+                    return
+        finally:
+            for future in futures:
+                future.cancel()
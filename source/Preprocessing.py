@@ -0,0 +1,124 @@
+import time
+from collections import Counter, defaultdict
+
+import KnowledgeBase as kb
+
+
+def canonicalize(knowledge_base, clauses, negated_target):
+    """
+    Chuẩn hóa mỗi mệnh đề: bỏ literal lặp lại và sắp xếp literal (A OR -B và -B OR A trở thành một)
+    """
+    return [knowledge_base.standardize_statement(clause) for clause in clauses]
+
+
+def remove_duplicates(knowledge_base, clauses, negated_target):
+    """
+    Bỏ các mệnh đề trùng lặp, giữ lần xuất hiện đầu tiên
+    """
+    seen = set()
+    result = []
+    for clause in clauses:
+        key = tuple(clause)
+        if key not in seen:
+            seen.add(key)
+            result.append(clause)
+    return result
+
+
+def remove_tautologies(knowledge_base, clauses, negated_target):
+    """
+    Bỏ các mệnh đề hằng đúng (chứa cả literal và phủ định của nó)
+    """
+    return [clause for clause in clauses if not knowledge_base.has_contradiction(clause)]
+
+
+def eliminate_pure_literals(knowledge_base, clauses, negated_target):
+    """
+    Bỏ các mệnh đề chứa literal thuần (phủ định của nó không xuất hiện trong KB lẫn ¬α), lặp tới điểm bất động
+
+    Các mệnh đề của ¬α không bị bỏ nhưng literal của chúng vẫn được tính,
+    vì vậy KB ∧ ¬α thỏa được khi và chỉ khi KB đã rút gọn ∧ ¬α thỏa được.
+    """
+    invert = knowledge_base.invert_literal
+    counts = Counter(literal for clause in clauses for literal in set(clause))
+    counts.update(literal for clause in negated_target for literal in set(clause))
+    occurrences = defaultdict(list)
+    for clause_id, clause in enumerate(clauses):
+        for literal in set(clause):
+            occurrences[literal].append(clause_id)
+
+    removed = [False] * len(clauses)
+    queue = [literal for literal in counts if not counts[invert(literal)]]
+    while queue:
+        literal = queue.pop()
+        for clause_id in occurrences[literal]:
+            if removed[clause_id]:
+                continue
+            removed[clause_id] = True
+            for other in set(clauses[clause_id]):
+                counts[other] -= 1
+                # Literal đối ngẫu của other trở thành thuần khi other không còn xuất hiện
+                if not counts[other] and counts[invert(other)]:
+                    queue.append(invert(other))
+    return [clause for clause_id, clause in enumerate(clauses) if not removed[clause_id]]
+
+
+# Các bước có sẵn theo tên, theo thứ tự mặc định
+STAGES = {
+    'canonicalize': canonicalize,
+    'dedup': remove_duplicates,
+    'tautology': remove_tautologies,
+    'pure': eliminate_pure_literals,
+}
+
+
+class PreprocessPipeline:
+    """
+    Chuỗi các bước tiền xử lý chạy giữa bước đọc input và bước chứng minh
+
+    Mỗi bước là một hàm (knowledge_base, clauses, negated_target) -> clauses,
+    có thể truyền theo tên trong STAGES hoặc truyền trực tiếp hàm.
+    """
+
+    def __init__(self, stages=None):
+        if stages is None:
+            stages = list(STAGES)
+        self.stages = []
+        for stage in stages:
+            if callable(stage):
+                self.stages.append((stage.__name__, stage))
+            elif stage in STAGES:
+                self.stages.append((stage, STAGES[stage]))
+            else:
+                raise ValueError(f"Bước tiền xử lý không hợp lệ: {stage}")
+        # Thống kê của lần chạy gần nhất, mỗi bước một dict
+        self.stats = []
+
+    def run(self, knowledge_base, query, negation='distribute'):
+        """
+        Chạy các bước trên KB và trả về một KnowledgeBase mới đã được rút gọn
+
+        :param query: Mệnh đề cần chứng minh (dùng để tính ¬α cho bước literal thuần)
+        :param negation: Cách phủ định α (xem KnowledgeBase.invert_expression), hai cách có cùng
+                         tập literal trên các biến của KB nên cho cùng kết quả rút gọn
+        """
+        negated_target = knowledge_base.invert_expression(query, negation)
+        clauses = list(knowledge_base.database)
+        self.stats = []
+        for name, stage in self.stages:
+            start_time = time.perf_counter()
+            result = stage(knowledge_base, clauses, negated_target)
+            self.stats.append({
+                'stage': name,
+                'clauses_in': len(clauses),
+                'clauses_out': len(result),
+                'literals_in': sum(len(clause) for clause in clauses),
+                'literals_out': sum(len(clause) for clause in result),
+                'seconds': time.perf_counter() - start_time,
+            })
+            clauses = result
+
+        processed = kb.KnowledgeBase()
+        for clause in clauses:
+            processed.insert(clause)
+        return processed
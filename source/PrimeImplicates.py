@@ -0,0 +1,98 @@
+import hashlib
+import time
+
+import KnowledgeBase as kb
+from ClauseStore import ClauseStore, SubsumptionIndex
+from KBCache import compile_kb, load_kb
+from ResolutionSession import ResolutionSession
+from ResourceBudget import UNKNOWN
+
+
+class PrimeImplicates:
+    """
+    Tập prime implicate của một KB: các mệnh đề tối tiểu theo subsumption của bao đóng hợp giải
+
+    Với mệnh đề α không phải hằng đúng, KB ⊨ α khi và chỉ khi có một prime implicate là
+    tập con của α, nên sau khi biên dịch mỗi truy vấn chỉ là một lần tra chỉ mục subsumption.
+    KB mâu thuẫn có đúng một prime implicate là mệnh đề rỗng (subsume mọi mệnh đề).
+    """
+
+    def __init__(self, clauses):
+        self.clauses = clauses
+        # Mệnh đề rỗng không được đưa vào chỉ mục subsumption nên được kiểm tra riêng
+        self.inconsistent = any(not clause for clause in clauses)
+        self.index = SubsumptionIndex()
+        for clause_id, clause in enumerate(clauses):
+            self.index.add(clause_id, clause)
+        # Thống kê của lần biên dịch (chỉ có khi tạo bằng compile)
+        self.stats = None
+
+    def __len__(self):
+        return len(self.clauses)
+
+    @staticmethod
+    def kb_key(clauses):
+        # Khóa của KB không phụ thuộc thứ tự mệnh đề và thứ tự literal
+        return hashlib.sha256(repr(sorted(tuple(sorted(set(clause))) for clause in clauses)).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def compile(cls, knowledge_base, budget=None):
+        """
+        Tính tập prime implicate bằng cách bão hòa KB với hợp giải và subsumption (ResolutionSession)
+
+        :param budget: ResourceBudget giới hạn quá trình bão hòa
+        """
+        start_time = time.perf_counter()
+        # Literal lặp lại không đổi nghĩa của mệnh đề, bỏ đi để mọi mệnh đề đều dùng được để subsume
+        standardized = kb.KnowledgeBase()
+        for clause in knowledge_base.database:
+            standardized.insert(list(dict.fromkeys(clause)))
+
+        session = ResolutionSession(standardized, subsumption=True, budget=budget)
+        # Truy vấn rỗng không có tập hỗ trợ: vòng lặp chỉ bão hòa bao đóng của KB
+        if session.prove([]) == UNKNOWN:
+            exceeded = session.budget_exceeded
+            raise ValueError(f"Biên dịch prime implicate vượt giới hạn {exceeded['limit']} "
+                             f"({exceeded['value']:.7g} > {exceeded['max']})")
+
+        closure = session.closure
+        if session.inconsistent:
+            clauses = [[]]
+        else:
+            clauses = [clause for clause_id, clause in enumerate(closure.store) if closure.alive[clause_id]]
+        implicates = cls(clauses)
+        implicates.stats = {
+            'kb_clauses': len(knowledge_base.database),
+            'resolvents': session.stats['kb_resolvents'],
+            'subsumed': session.stats['subsumed'],
+            'implicates': len(clauses),
+            'literals': sum(len(clause) for clause in clauses),
+            'seconds': time.perf_counter() - start_time,
+        }
+        return implicates
+
+    def save(self, filepath):
+        # Dùng lại định dạng nhị phân của KBCache (các prime implicate là KB, query rỗng)
+        knowledge_base = kb.KnowledgeBase()
+        knowledge_base.database = ClauseStore.from_unique(self.clauses)
+        compile_kb(knowledge_base, [], filepath)
+
+    @classmethod
+    def load(cls, filepath):
+        loaded = load_kb(filepath)
+        if loaded is None:
+            raise ValueError(f"File prime implicate không hợp lệ: {filepath}")
+        return cls(list(loaded[0].database))
+
+    def entails_clause(self, clause):
+        # KB ⊨ clause: clause là hằng đúng hoặc bị một prime implicate subsume
+        literals = set(clause)
+        if self.inconsistent or any(('-' + literal) in literals for literal in literals):
+            return True
+        return self.index.find_subsuming(literals) is not None
+
+    def entails(self, query):
+        """
+        Kiểm tra KB ⊨ query với query là hội các mệnh đề (cùng dạng với prove_by_resolution)
+        """
+        return all(self.entails_clause(clause) for clause in query)
@@ -0,0 +1,137 @@
+from array import array
+
+
+class ProofDAG:
+    """
+    Đồ thị chứng minh của một lần hợp giải, lưu bằng các mảng số nguyên
+
+    Mỗi nút là một mệnh đề: mệnh đề ban đầu (KB, ¬α) không có cha, resolvent có hai cha,
+    số vòng sinh ra nó và vị trí literal pivot trong mệnh đề cha thứ nhất.
+    Mệnh đề được lưu bằng tham chiếu tới đúng đối tượng trong KB (không sao chép),
+    nên bộ nhớ tăng theo số mệnh đề chứ không theo số bản sao list như resolution_path cũ.
+    """
+
+    NO_PARENT = -1
+
+    def __init__(self, negate=None, decode=None):
+        # negate: hàm đảo literal của engine, dùng để xác định pivot
+        self.negate = negate
+        # decode: hàm chuyển mệnh đề của engine về list chuỗi (mặc định giữ nguyên)
+        self.decode = decode if decode is not None else (lambda clause: clause)
+        self.clauses = []
+        self.left = array('i')
+        self.right = array('i')
+        self.rounds = array('i')
+        self.pivots = array('i')
+        # Nút mệnh đề rỗng (nếu chứng minh thành công)
+        self.root = None
+
+    def __len__(self):
+        return len(self.clauses)
+
+    def _add(self, clause, left, right, round_number, pivot):
+        self.clauses.append(clause)
+        self.left.append(left)
+        self.right.append(right)
+        self.rounds.append(round_number)
+        self.pivots.append(pivot)
+        return len(self.clauses) - 1
+
+    def add_input(self, clause):
+        """
+        Thêm một mệnh đề ban đầu
+
+        :return: id nút
+        """
+        return self._add(clause, self.NO_PARENT, self.NO_PARENT, 0, -1)
+
+    def add_resolvent(self, clause, left, right, round_number):
+        """
+        Thêm resolvent của hai nút left, right
+
+        :return: id nút
+        """
+        return self._add(clause, left, right, round_number, self._find_pivot(clause, left, right))
+
+    def _find_pivot(self, clause, left, right):
+        # Vị trí trong mệnh đề cha thứ nhất của literal bị hợp giải: ưu tiên literal đối ngẫu
+        # không còn trong resolvent (literal lặp lại có thể vẫn còn theo ngữ nghĩa đa tập)
+        first, second = self.clauses[left], self.clauses[right]
+        candidates = [position for position, literal in enumerate(first) if self.negate(literal) in second]
+        for position in candidates:
+            literal = first[position]
+            if literal not in clause and self.negate(literal) not in clause:
+                return position
+        return candidates[0] if candidates else -1
+
+    def parents(self, node):
+        """
+        :return: (id cha thứ nhất, id cha thứ hai) hoặc None nếu là mệnh đề ban đầu
+        """
+        if self.left[node] == self.NO_PARENT:
+            return None
+        return self.left[node], self.right[node]
+
+    def pivot(self, node):
+        """
+        :return: Literal pivot (dạng của engine) hoặc None nếu là mệnh đề ban đầu
+        """
+        if self.left[node] == self.NO_PARENT or self.pivots[node] < 0:
+            return None
+        return self.clauses[self.left[node]][self.pivots[node]]
+
+    def clause(self, node):
+        # Mệnh đề của nút dưới dạng list chuỗi
+        return self.decode(self.clauses[node])
+
+    def refutation(self, node=None):
+        """
+        Trích cây con tối thiểu dẫn tới node (mặc định là mệnh đề rỗng)
+
+        :return: Danh sách id nút tăng dần (cha luôn đứng trước con), rỗng nếu chưa chứng minh được
+        """
+        if node is None:
+            node = self.root
+        if node is None:
+            return []
+        seen = {node}
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if self.left[current] == self.NO_PARENT:
+                continue
+            for parent in (self.left[current], self.right[current]):
+                if parent not in seen:
+                    seen.add(parent)
+                    stack.append(parent)
+        return sorted(seen)
+
+    def steps(self, refutation_only=False):
+        """
+        Sinh các bước hợp giải (cha thứ nhất, cha thứ hai, resolvent) dạng list chuỗi theo thứ tự sinh ra
+
+        :param refutation_only: Chỉ lấy các bước thuộc cây con dẫn tới mệnh đề rỗng
+        """
+        nodes = self.refutation() if refutation_only else range(len(self))
+        for node in nodes:
+            if self.left[node] != self.NO_PARENT:
+                yield self.clause(self.left[node]), self.clause(self.right[node]), self.clause(node)
+
+    def path(self):
+        """
+        Đường đi hợp giải theo định dạng cũ của resolution_path: mỗi cặp sinh ra resolvent
+        là một bộ (mệnh đề i, mệnh đề j, danh sách resolvent), các resolvent liên tiếp của
+        cùng một cặp trong cùng một vòng được gộp lại
+        """
+        result = []
+        previous = None
+        for node in range(len(self)):
+            if self.left[node] == self.NO_PARENT:
+                continue
+            key = (self.left[node], self.right[node], self.rounds[node])
+            if key == previous:
+                result[-1][2].append(self.clause(node))
+            else:
+                result.append((self.clause(self.left[node]), self.clause(self.right[node]), [self.clause(node)]))
+                previous = key
+        return result
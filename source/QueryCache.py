@@ -0,0 +1,141 @@
+import hashlib
+from collections import OrderedDict
+
+from ResourceBudget import UNKNOWN
+
+
+class QueryCache:
+    """
+    Bộ nhớ đệm LRU kết quả chứng minh theo cặp (KB, α)
+
+    - Kết quả YES/NO được lưu theo khóa chuẩn hóa: tập mệnh đề KB và α không phụ thuộc
+      thứ tự mệnh đề, thứ tự literal trong mệnh đề (số lần lặp lại của literal vẫn được giữ
+      vì hợp giải xử lý literal lặp theo ngữ nghĩa đa tập).
+    - Vết hợp giải (danh sách các vòng, dạng list chuỗi) phụ thuộc thứ tự mệnh đề và các tùy chọn
+      làm thay đổi các mệnh đề được liệt kê (subsumption, unit_propagation, negation), nên chỉ được trả về
+      khi khớp cả khóa chính xác gồm thứ tự mệnh đề và các tùy chọn đó.
+
+    Khi vượt max_entries mục hoặc tổng kích thước vết vượt max_trace_clauses mệnh đề,
+    các mục ít được dùng gần đây nhất bị loại. Kết quả UNKNOWN (hết ngân sách) không được lưu.
+    """
+
+    # Các tùy chọn của prove_by_resolution làm thay đổi vết hợp giải (các tùy chọn khác cho cùng vết)
+    TRACE_OPTIONS = ('subsumption', 'unit_propagation', 'negation')
+
+    def __init__(self, max_entries=1024, max_trace_clauses=None):
+        self.max_entries = max_entries
+        self.max_trace_clauses = max_trace_clauses
+        # Khóa chuẩn hóa -> {'verdict', 'trace_key', 'trace', 'size'}, mục dùng gần nhất ở cuối
+        self.entries = OrderedDict()
+        self.trace_clauses = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _digest(value):
+        return hashlib.sha256(repr(value).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def canonical_key(cls, clauses, query):
+        # Khóa không phụ thuộc thứ tự: mỗi mệnh đề được sắp xếp, rồi sắp xếp danh sách mệnh đề
+        return cls._digest((sorted(tuple(sorted(clause)) for clause in clauses),
+                            sorted(tuple(sorted(clause)) for clause in query)))
+
+    @classmethod
+    def trace_key(cls, clauses, query, options=None):
+        # Khóa chính xác của vết: thứ tự mệnh đề và các tùy chọn ảnh hưởng tới vết
+        options = options or {}
+        return cls._digest(([tuple(clause) for clause in clauses], [tuple(clause) for clause in query],
+                            tuple(options.get(name) for name in cls.TRACE_OPTIONS)))
+
+    @staticmethod
+    def trace_size(trace):
+        return sum(len(step_results) for step_results in trace)
+
+    @staticmethod
+    def decode_rounds(result, symbols=None):
+        """
+        Chuyển các vòng hợp giải về dạng list chuỗi (engine int/numpy trả về tuple số nguyên)
+        """
+        if symbols is None:
+            return result
+        return [[symbols.decode_clause(clause) for clause in step_results] for step_results in result]
+
+    def lookup(self, clauses, query, options=None, trace=False):
+        """
+        Tìm kết quả của (KB, α) trong cache
+
+        :param trace: Cần cả vết hợp giải (chỉ trúng khi vết đã lưu khớp thứ tự mệnh đề và tùy chọn)
+        :return: (vết hoặc None, True/False) hoặc None nếu không có trong cache
+        """
+        key = self.canonical_key(clauses, query)
+        entry = self.entries.get(key)
+        if entry is not None and trace and entry['trace_key'] != self.trace_key(clauses, query, options):
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return (entry['trace'] if trace else None), entry['verdict']
+
+    def store(self, clauses, query, verdict, trace=None, options=None):
+        """
+        Lưu kết quả của (KB, α), kèm vết hợp giải dạng list chuỗi nếu có
+        """
+        if verdict == UNKNOWN:
+            return
+        key = self.canonical_key(clauses, query)
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.trace_clauses -= old['size']
+            # Giữ vết cũ nếu lần chạy này không có vết (ví dụ chỉ kiểm tra YES/NO)
+            if trace is None:
+                self.entries[key] = old
+                self.trace_clauses += old['size']
+                return
+
+        size = self.trace_size(trace) if trace is not None else 0
+        if self.max_trace_clauses is not None and size > self.max_trace_clauses:
+            # Vết quá lớn để lưu: chỉ giữ kết quả YES/NO
+            trace, size = None, 0
+        self.entries[key] = {
+            'verdict': verdict,
+            'trace_key': self.trace_key(clauses, query, options) if trace is not None else None,
+            'trace': trace,
+            'size': size,
+        }
+        self.trace_clauses += size
+        self._evict()
+
+    def _evict(self):
+        while self.entries and (len(self.entries) > self.max_entries or
+                                (self.max_trace_clauses is not None and self.trace_clauses > self.max_trace_clauses)):
+            _, entry = self.entries.popitem(last=False)
+            self.trace_clauses -= entry['size']
+            self.evictions += 1
+
+    def prove(self, knowledge_base, target, trace=True, **options):
+        """
+        knowledge_base.prove_by_resolution có ghi nhớ kết quả
+
+        :param trace: False nếu chỉ cần kết quả YES/NO (khi đó vết trả về là None)
+        :return: (các vòng hợp giải dạng list chuỗi hoặc None, kết quả)
+        """
+        cached = self.lookup(knowledge_base.database, target, options, trace)
+        if cached is not None:
+            return cached
+        result, is_proved = knowledge_base.prove_by_resolution(target, **options)
+        result = self.decode_rounds(result, knowledge_base.symbol_table)
+        self.store(knowledge_base.database, target, is_proved, result if trace else None, options)
+        return (result if trace else None), is_proved
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'entries': len(self.entries), 'trace_clauses': self.trace_clauses, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions,
+                'hit_rate': self.hits / total if total else 0.0}
@@ -0,0 +1,223 @@
+from ClauseStore import OccurrenceIndex, ClauseStore, SubsumptionIndex
+from ResourceBudget import UNKNOWN
+
+
+class _ClauseSet:
+    """
+    Một tập mệnh đề của phiên (bao đóng KB hoặc tập hỗ trợ của một truy vấn)
+
+    Các mệnh đề được chọn lần lượt theo thứ tự thêm vào; store[:processed] đã được xử lý
+    và có trong chỉ mục literal. Mệnh đề bị subsume bởi mệnh đề thêm sau được đánh dấu
+    alive = False và không còn tham gia hợp giải.
+    """
+
+    def __init__(self, negate, subsumption=False):
+        self.store = ClauseStore()
+        self.alive = []
+        self.processed = 0
+        self.index = OccurrenceIndex(negate)
+        self.subsumption_index = SubsumptionIndex() if subsumption else None
+        # Khóa mệnh đề -> (cha thứ nhất, cha thứ hai) của các resolvent
+        self.parents = {}
+        self.literals = 0
+        self.subsumed = 0
+
+    def __len__(self):
+        return len(self.store)
+
+    def add(self, clause, parents=None, others=()):
+        """
+        Thêm mệnh đề nếu nó chưa có trong tập này và các tập others,
+        và (khi bật subsumption) không bị mệnh đề nào của các tập đó subsume
+
+        :return: True nếu mệnh đề được thêm
+        """
+        if clause in self.store or any(clause in other.store for other in others):
+            return False
+        if self.subsumption_index is not None:
+            if any(clause_set.subsumption_index.find_subsuming(clause) is not None
+                   for clause_set in (self,) + others):
+                self.subsumed += 1
+                return False
+            # Mệnh đề có literal lặp lại hợp giải theo ngữ nghĩa đa tập nên không dùng để subsume
+            if len(set(clause)) == len(clause):
+                for clause_id in self.subsumption_index.find_subsumed(clause):
+                    self.alive[clause_id] = False
+                    self.subsumption_index.remove(clause_id)
+                    self.subsumed += 1
+            self.subsumption_index.add(len(self.store), clause)
+        self.store.append(clause)
+        self.alive.append(True)
+        self.literals += len(clause)
+        if parents is not None:
+            self.parents[tuple(clause)] = parents
+        return True
+
+    def next_given(self):
+        """
+        :return: id của mệnh đề còn sống tiếp theo chưa được xử lý, hoặc None
+        """
+        while self.processed < len(self.store) and not self.alive[self.processed]:
+            self.processed += 1
+        return self.processed if self.processed < len(self.store) else None
+
+    def mark_processed(self, clause_id):
+        self.index.add(clause_id, self.store[clause_id])
+        self.processed = clause_id + 1
+
+    def partners(self, clause):
+        # Id các mệnh đề đã xử lý, còn sống và có literal đối ngẫu với clause
+        return [j for j in self.index.partners(clause, 0) if self.alive[j]]
+
+
+class ResolutionSession:
+    """
+    Phiên trả lời nhiều truy vấn α trên cùng một KB
+
+    Hợp giải theo kiểu "given clause": mỗi mệnh đề được chọn sẽ hợp giải với tất cả các mệnh đề
+    đã xử lý trước nó, nên khi không còn mệnh đề nào để chọn thì mọi cặp đều đã được xét
+    và kết quả YES/NO giống prove_by_resolution.
+
+    - Bao đóng KB (closure): KB ban đầu và các resolvent của hai mệnh đề thuộc bao đóng.
+      Phần này chỉ phụ thuộc KB nên được giữ lại và dùng chung cho mọi truy vấn.
+    - Tập hỗ trợ (support) của một truy vấn: các mệnh đề ¬α và mọi resolvent có một cha thuộc
+      tập hỗ trợ. Chúng được ưu tiên chọn trước và bị bỏ đi khi truy vấn kết thúc.
+
+    subsumption=True bỏ các resolvent đã bị một mệnh đề của bao đóng hoặc tập hỗ trợ subsume
+    và loại các mệnh đề bị mệnh đề mới subsume trong cùng tập. Mệnh đề có literal lặp lại
+    (ngữ nghĩa đa tập, xem apply_resolution) yếu hơn tập literal của nó nên chỉ có thể bị subsume.
+    Nhờ vậy kết quả YES/NO không đổi nhưng số mệnh đề sinh ra ít hơn nhiều.
+
+    negation: cách phủ định α ('distribute' hoặc 'tseitin', xem KnowledgeBase.invert_expression).
+    Các biến mới của dạng Tseitin chỉ xuất hiện trong tập hỗ trợ nên không ảnh hưởng tới bao đóng KB.
+    """
+
+    EMPTY = ('{}',)
+
+    def __init__(self, knowledge_base, subsumption=False, budget=None, negation='distribute'):
+        self.knowledge_base = knowledge_base
+        self.subsumption = subsumption
+        self.negation = negation
+        self.closure = _ClauseSet(knowledge_base.invert_literal, subsumption)
+        for clause in knowledge_base.database:
+            self.closure.add(clause)
+        self.kb_size = len(self.closure)
+        # KB mâu thuẫn: mệnh đề rỗng suy ra được chỉ từ KB, mọi truy vấn đều đúng
+        self.inconsistent = False
+        # Giới hạn tài nguyên cho mỗi truy vấn (ResourceBudget) và giới hạn đã bị vượt ở truy vấn gần nhất
+        self.budget = budget
+        self.budget_exceeded = None
+        # Các bước của cây chứng minh ở truy vấn gần nhất (chỉ khi prove(..., trace=True))
+        self.trace = None
+        self.stats = {'queries': 0, 'kb_resolvents': 0, 'query_resolvents': 0, 'subsumed': 0}
+
+    def prove(self, target, trace=False):
+        """
+        Kiểm tra KB ⊨ target
+
+        :param trace: Lưu các bước hợp giải dẫn tới mệnh đề rỗng vào self.trace,
+                      mỗi bước là (cha thứ nhất, cha thứ hai, resolvent) dạng list chuỗi
+        :return: True, False hoặc UNKNOWN (hết ngân sách tài nguyên)
+        """
+        knowledge_base = self.knowledge_base
+        apply = knowledge_base.apply_resolution
+        closure = self.closure
+        self.budget_exceeded = None
+        self.trace = None
+        if self.budget is not None:
+            self.budget.start()
+
+        support = _ClauseSet(knowledge_base.invert_literal, self.subsumption)
+        for clause in knowledge_base.invert_expression(target, self.negation):
+            if not knowledge_base.has_contradiction(clause):
+                support.add(clause, others=(closure,))
+        negated_size = len(support)
+        subsumed = closure.subsumed
+
+        try:
+            is_proved = self.inconsistent
+            while not is_proved:
+                given_id = support.next_given()
+                current = support
+                if given_id is None:
+                    given_id = closure.next_given()
+                    current = closure
+                    if given_id is None:
+                        break
+                given = current.store[given_id]
+
+                # Hợp giải với các mệnh đề KB đã xử lý: resolvent của hai mệnh đề KB thuộc bao đóng
+                # (luôn xét hết các cặp này để bao đóng không bị thiếu khi dừng sớm)
+                for j in closure.partners(given):
+                    other = closure.store[j]
+                    for resolvent in apply(other, given, current.store):
+                        if current is closure:
+                            if resolvent == ['{}']:
+                                closure.parents[self.EMPTY] = (other, given)
+                                self.inconsistent = True
+                            else:
+                                closure.add(resolvent, (other, given))
+                        elif resolvent == ['{}']:
+                            support.parents[self.EMPTY] = (other, given)
+                            is_proved = True
+                        else:
+                            support.add(resolvent, (other, given), (closure,))
+                    if is_proved:
+                        break
+                if current is closure:
+                    closure.mark_processed(given_id)
+                    is_proved = self.inconsistent
+
+                # Hợp giải với các mệnh đề đã xử lý của tập hỗ trợ
+                for j in support.partners(given) if not is_proved else ():
+                    other = support.store[j]
+                    for resolvent in apply(other, given, support.store):
+                        if resolvent == ['{}']:
+                            support.parents[self.EMPTY] = (other, given)
+                            is_proved = True
+                            break
+                        support.add(resolvent, (other, given), (closure,))
+                    if is_proved:
+                        break
+                if current is support:
+                    support.mark_processed(given_id)
+
+                if self.budget is not None and not is_proved:
+                    exceeded = self.budget.check(len(closure) + len(support), len(support),
+                                                 closure.literals + support.literals)
+                    if exceeded is not None:
+                        self.budget_exceeded = self.budget.exceeded
+                        return UNKNOWN
+        finally:
+            self.stats['queries'] += 1
+            self.stats['kb_resolvents'] = len(closure) - self.kb_size
+            self.stats['query_resolvents'] += len(support) - negated_size
+            self.stats['subsumed'] += closure.subsumed - subsumed + support.subsumed
+
+        if trace:
+            self.trace = self._refutation(support.parents) if is_proved else []
+        return is_proved
+
+    def _refutation(self, support_parents):
+        """
+        Trích các bước dẫn tới mệnh đề rỗng, cha luôn đứng trước con
+
+        Cha của mệnh đề thuộc bao đóng được ưu tiên lấy từ bao đóng (các mệnh đề cha của chúng
+        cũng thuộc bao đóng và được thêm trước), nên đồ thị duyệt luôn không có chu trình.
+        """
+        steps = []
+        done = set()
+        stack = [(self.EMPTY, False)]
+        while stack:
+            key, expanded = stack.pop()
+            parents = self.closure.parents.get(key) or support_parents.get(key)
+            if parents is None or (key in done and not expanded):
+                continue
+            if expanded:
+                steps.append((parents[0], parents[1], list(key)))
+                continue
+            done.add(key)
+            stack.append((key, True))
+            for parent in reversed(parents):
+                stack.append((tuple(parent), False))
+        return steps
@@ -0,0 +1,88 @@
+import time
+
+
+# Kết quả chứng minh khi hết ngân sách tài nguyên (bên cạnh True/False)
+UNKNOWN = 'UNKNOWN'
+
+
+class ResourceBudget:
+    """
+    Giới hạn tài nguyên cho một lần hợp giải, được kiểm tra trong vòng lặp hợp giải:
+    mọi giới hạn sau mỗi resolvent mới và khi kết thúc mỗi vòng (trước khi bắt đầu vòng sau),
+    riêng thời gian còn được kiểm tra sau mỗi CHECK_INTERVAL cặp (hoặc mỗi khối cặp của NumPy,
+    mỗi khối hàng của tiến trình con) kể cả khi các cặp đó không sinh ra resolvent nào.
+
+    - max_seconds: thời gian chạy (giây)
+    - max_clauses: tổng số mệnh đề (KB, ¬α và các resolvent)
+    - max_round_clauses: số mệnh đề mới trong một vòng
+    - max_memory_mb: bộ nhớ ước lượng của các mệnh đề (MB)
+
+    Giới hạn bằng None nghĩa là không giới hạn.
+    """
+
+    # Ước lượng bộ nhớ: chi phí cố định của một mệnh đề (đối tượng, khóa băm) và của một literal
+    CLAUSE_BYTES = 120
+    LITERAL_BYTES = 8
+    # Số cặp được hợp giải giữa hai lần kiểm tra thời gian
+    CHECK_INTERVAL = 1024
+
+    def __init__(self, max_seconds=None, max_clauses=None, max_round_clauses=None, max_memory_mb=None):
+        self.limits = {
+            'max_seconds': max_seconds,
+            'max_clauses': max_clauses,
+            'max_round_clauses': max_round_clauses,
+            'max_memory_mb': max_memory_mb,
+        }
+        self.started = None
+        # Giới hạn đã bị vượt ở lần chạy gần nhất: {'limit', 'max', 'value'} hoặc None
+        self.exceeded = None
+
+    def start(self):
+        # Bắt đầu tính giờ cho một lần hợp giải mới
+        self.started = time.perf_counter()
+        self.exceeded = None
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def check_time(self):
+        """
+        Chỉ kiểm tra giới hạn thời gian (các giới hạn khác chỉ thay đổi khi có resolvent mới)
+
+        :return: 'max_seconds' nếu đã hết thời gian, ngược lại None
+        """
+        maximum = self.limits['max_seconds']
+        if maximum is None:
+            return None
+        value = self.elapsed()
+        if value > maximum:
+            self.exceeded = {'limit': 'max_seconds', 'max': maximum, 'value': value}
+            return 'max_seconds'
+        return None
+
+    def estimate_memory_mb(self, total_clauses, literals):
+        return (total_clauses * self.CLAUSE_BYTES + literals * self.LITERAL_BYTES) / (1 << 20)
+
+    def check(self, total_clauses, round_clauses, literals):
+        """
+        Kiểm tra các giới hạn với trạng thái hiện tại của vòng lặp hợp giải
+
+        :param total_clauses: Tổng số mệnh đề (KB và các mệnh đề mới của vòng hiện tại)
+        :param round_clauses: Số mệnh đề mới của vòng hiện tại
+        :param literals: Tổng số literal của các mệnh đề
+        :return: Tên giới hạn bị vượt hoặc None
+        """
+        values = {
+            'max_seconds': self.elapsed,
+            'max_clauses': lambda: total_clauses,
+            'max_round_clauses': lambda: round_clauses,
+            'max_memory_mb': lambda: self.estimate_memory_mb(total_clauses, literals),
+        }
+        for limit, maximum in self.limits.items():
+            if maximum is None:
+                continue
+            value = values[limit]()
+            if value > maximum:
+                self.exceeded = {'limit': limit, 'max': maximum, 'value': value}
+                return limit
+        return None
@@ -0,0 +1,296 @@
+import heapq
+
+
+def luby(index):
+    """
+    Phần tử thứ index (bắt đầu từ 1) của dãy Luby: 1 1 2 1 1 2 4 1 1 2 ...
+    """
+    while True:
+        size = 1
+        while (size << 1) - 1 < index:
+            size <<= 1
+        if (size << 1) - 1 == index:
+            return size
+        index -= size - 1
+
+
+def literal_index(literal):
+    # Vị trí của literal trong danh sách theo dõi: +v -> 2v, -v -> 2v + 1
+    return 2 * literal if literal > 0 else -2 * literal + 1
+
+
+class CDCLSolver:
+    """
+    Bộ giải SAT CDCL (Conflict-Driven Clause Learning) trên mệnh đề số nguyên có dấu
+
+    - Hai literal theo dõi (watched literals) cho lan truyền mệnh đề đơn
+    - Học mệnh đề theo điểm 1UIP và rút gọn mệnh đề học được
+    - Chọn biến theo độ hoạt động kiểu VSIDS, ghi nhớ dấu (phase saving)
+    - Khởi động lại theo dãy Luby
+    """
+
+    # Hệ số suy giảm độ hoạt động và số xung đột cơ sở giữa hai lần khởi động lại
+    DECAY = 0.95
+    RESTART_BASE = 100
+
+    def __init__(self, num_vars, clauses=()):
+        self.num_vars = num_vars
+        self.clauses = []
+        self.watches = [[] for _ in range(2 * num_vars + 2)]
+        # Giá trị của biến: 1 (đúng), -1 (sai), 0 (chưa gán)
+        self.values = [0] * (num_vars + 1)
+        self.levels = [0] * (num_vars + 1)
+        self.reasons = [None] * (num_vars + 1)
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+
+        self.activity = [0.0] * (num_vars + 1)
+        self.var_inc = 1.0
+        self.phases = [False] * (num_vars + 1)
+        self.heap = [(0.0, var) for var in range(1, num_vars + 1)]
+        heapq.heapify(self.heap)
+
+        self.unsat = False
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+        self.restarts = 0
+        self.learned = 0
+
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def value(self, literal):
+        # Giá trị của literal theo phép gán hiện tại
+        value = self.values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def add_clause(self, clause):
+        """
+        Thêm mệnh đề ban đầu (trước khi gọi solve)
+        """
+        literals = list(dict.fromkeys(clause))
+        if any(-literal in literals for literal in literals):
+            return
+        if not literals:
+            self.unsat = True
+        elif len(literals) == 1:
+            if not self.enqueue(literals[0], None):
+                self.unsat = True
+        else:
+            self.attach(literals)
+
+    def attach(self, literals):
+        # Lưu mệnh đề và theo dõi hai literal đầu tiên
+        clause_id = len(self.clauses)
+        self.clauses.append(literals)
+        self.watches[literal_index(literals[0])].append(clause_id)
+        self.watches[literal_index(literals[1])].append(clause_id)
+        return clause_id
+
+    def enqueue(self, literal, reason):
+        """
+        Gán literal là đúng với lý do reason (None nếu là quyết định hoặc mệnh đề đơn)
+
+        :return: False nếu literal đã bị gán sai
+        """
+        value = self.value(literal)
+        if value:
+            return value > 0
+        var = abs(literal)
+        self.values[var] = 1 if literal > 0 else -1
+        self.levels[var] = len(self.trail_limits)
+        self.reasons[var] = reason
+        self.trail.append(literal)
+        return True
+
+    def propagate(self):
+        """
+        Lan truyền mệnh đề đơn cho tới điểm bất động
+
+        :return: id mệnh đề xung đột hoặc None
+        """
+        values = self.values
+        while self.head < len(self.trail):
+            false_literal = -self.trail[self.head]
+            self.head += 1
+            self.propagations += 1
+            watchers = self.watches[literal_index(false_literal)]
+            i = j = 0
+            while i < len(watchers):
+                clause_id = watchers[i]
+                i += 1
+                clause = self.clauses[clause_id]
+                # Literal bị gán sai luôn nằm ở vị trí theo dõi thứ hai
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                first = clause[0]
+                first_value = values[abs(first)] if first > 0 else -values[abs(first)]
+                if first_value > 0:
+                    watchers[j] = clause_id
+                    j += 1
+                    continue
+                # Tìm literal chưa sai để theo dõi thay thế
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    if (values[abs(literal)] if literal > 0 else -values[abs(literal)]) >= 0:
+                        clause[1], clause[k] = literal, false_literal
+                        self.watches[literal_index(literal)].append(clause_id)
+                        break
+                else:
+                    watchers[j] = clause_id
+                    j += 1
+                    if first_value < 0:
+                        # Xung đột: giữ lại các mệnh đề theo dõi chưa duyệt
+                        while i < len(watchers):
+                            watchers[j] = watchers[i]
+                            i += 1
+                            j += 1
+                        del watchers[j:]
+                        return clause_id
+                    self.enqueue(first, clause_id)
+            del watchers[j:]
+        return None
+
+    def bump(self, var):
+        # Tăng độ hoạt động của biến tham gia xung đột
+        self.activity[var] += self.var_inc
+        if self.activity[var] > 1e100:
+            # Chia lại tỉ lệ để tránh tràn số, dựng lại heap vì mọi khóa cũ đều lệch
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.var_inc *= 1e-100
+            self.heap = [(-self.activity[v], v) for v in range(1, self.num_vars + 1) if not self.values[v]]
+            heapq.heapify(self.heap)
+        else:
+            heapq.heappush(self.heap, (-self.activity[var], var))
+
+    def analyze(self, conflict):
+        """
+        Phân tích xung đột theo điểm 1UIP
+
+        :return: (mệnh đề học được với literal khẳng định ở đầu, mức quay lui)
+        """
+        learnt = [None]
+        seen = set()
+        counter = 0
+        literal = None
+        index = len(self.trail) - 1
+        current_level = len(self.trail_limits)
+        reason = self.clauses[conflict]
+        while True:
+            for other in (reason if literal is None else reason[1:]):
+                var = abs(other)
+                if var not in seen and self.levels[var] > 0:
+                    seen.add(var)
+                    self.bump(var)
+                    if self.levels[var] >= current_level:
+                        counter += 1
+                    else:
+                        learnt.append(other)
+            # Literal gần nhất trên trail thuộc xung đột
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            counter -= 1
+            if counter == 0:
+                break
+            reason = self.clauses[self.reasons[abs(literal)]]
+        learnt[0] = -literal
+
+        # Rút gọn: bỏ literal mà lý do của nó chỉ gồm các biến đã có trong mệnh đề học được
+        in_learnt = {abs(other) for other in learnt}
+        minimized = [learnt[0]]
+        for other in learnt[1:]:
+            reason_id = self.reasons[abs(other)]
+            if reason_id is None or not all(abs(r) in in_learnt or self.levels[abs(r)] == 0
+                                            for r in self.clauses[reason_id][1:]):
+                minimized.append(other)
+
+        if len(minimized) == 1:
+            return minimized, 0
+        # Đưa literal có mức cao nhất (ngoài literal khẳng định) về vị trí theo dõi thứ hai
+        best = max(range(1, len(minimized)), key=lambda k: self.levels[abs(minimized[k])])
+        minimized[1], minimized[best] = minimized[best], minimized[1]
+        return minimized, self.levels[abs(minimized[1])]
+
+    def backtrack(self, level):
+        # Hủy các phép gán ở mức lớn hơn level, ghi nhớ dấu của biến
+        if len(self.trail_limits) <= level:
+            return
+        limit = self.trail_limits[level]
+        for literal in self.trail[limit:]:
+            var = abs(literal)
+            self.phases[var] = literal > 0
+            self.values[var] = 0
+            self.reasons[var] = None
+            heapq.heappush(self.heap, (-self.activity[var], var))
+        del self.trail[limit:]
+        del self.trail_limits[level:]
+        self.head = len(self.trail)
+
+    def pick_branch(self):
+        # Biến chưa gán có độ hoạt động lớn nhất (bỏ qua các khóa cũ trong heap)
+        while self.heap:
+            key, var = heapq.heappop(self.heap)
+            if not self.values[var] and -key == self.activity[var]:
+                return var if self.phases[var] else -var
+        for var in range(1, self.num_vars + 1):
+            if not self.values[var]:
+                return var if self.phases[var] else -var
+        return None
+
+    def solve(self):
+        """
+        :return: True nếu tập mệnh đề thỏa được, False nếu không thỏa được
+        """
+        if self.unsat or self.propagate() is not None:
+            return False
+        restart_limit = luby(1) * self.RESTART_BASE
+        conflicts_since_restart = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts_since_restart += 1
+                if not self.trail_limits:
+                    return False
+                learnt, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.enqueue(learnt[0], self.attach(learnt))
+                self.learned += 1
+                self.var_inc /= self.DECAY
+                continue
+
+            if conflicts_since_restart >= restart_limit:
+                self.restarts += 1
+                conflicts_since_restart = 0
+                restart_limit = luby(self.restarts + 1) * self.RESTART_BASE
+                self.backtrack(0)
+                continue
+
+            literal = self.pick_branch()
+            if literal is None:
+                return True
+            self.decisions += 1
+            self.trail_limits.append(len(self.trail))
+            self.enqueue(literal, None)
+
+    def model(self):
+        """
+        Phép gán thỏa mãn sau khi solve() trả về True: {id biến: giá trị}
+        """
+        return {var: self.values[var] > 0 for var in range(1, self.num_vars + 1)}
+
+    def stats(self):
+        return {
+            'conflicts': self.conflicts,
+            'decisions': self.decisions,
+            'propagations': self.propagations,
+            'restarts': self.restarts,
+            'learned': self.learned,
+        }
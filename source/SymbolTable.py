@@ -0,0 +1,71 @@
+class SymbolTable:
+    """
+    Bảng ký hiệu ánh xạ mỗi biến mệnh đề sang một số nguyên dương.
+    Literal dương X được mã hóa thành +id, literal phủ định -X thành -id.
+    Mệnh đề rỗng {} được biểu diễn bằng tuple rỗng ().
+    """
+
+    def __init__(self, names=()):
+        # Ánh xạ tên biến -> id và id -> tên biến (id bắt đầu từ 1)
+        self.ids = {}
+        self.names = [None]
+        # Cấp id theo thứ tự tên đã sắp xếp để sắp xếp theo abs(id)
+        # cho cùng thứ tự với standardize_statement
+        for name in sorted(set(names)):
+            self.intern(name)
+
+    @staticmethod
+    def variable_of(literal):
+        # Lấy tên biến của một literal (bỏ dấu - nếu có)
+        return literal[1:] if literal[0] == '-' else literal
+
+    @classmethod
+    def from_clauses(cls, clauses):
+        """
+        Tạo bảng ký hiệu từ danh sách các mệnh đề dạng chuỗi
+        """
+        return cls(cls.variable_of(literal) for clause in clauses for literal in clause)
+
+    def __len__(self):
+        return len(self.names) - 1
+
+    def intern(self, name):
+        """
+        Trả về id của biến, cấp id mới nếu biến chưa có trong bảng
+        """
+        symbol_id = self.ids.get(name)
+        if symbol_id is None:
+            symbol_id = len(self.names)
+            self.ids[name] = symbol_id
+            self.names.append(name)
+        return symbol_id
+
+    def encode_literal(self, literal):
+        # Chuyển literal dạng chuỗi sang số nguyên có dấu
+        if literal[0] == '-':
+            return -self.intern(literal[1:])
+        return self.intern(literal)
+
+    def decode_literal(self, code):
+        # Chuyển số nguyên có dấu về literal dạng chuỗi
+        if code < 0:
+            return '-' + self.names[-code]
+        return self.names[code]
+
+    def encode_clause(self, clause):
+        """
+        Mã hóa một mệnh đề dạng list chuỗi thành tuple số nguyên (giữ nguyên thứ tự)
+        """
+        return tuple(self.encode_literal(literal) for literal in clause)
+
+    def decode_clause(self, clause):
+        """
+        Giải mã tuple số nguyên về list chuỗi, mệnh đề rỗng trả về ['{}']
+        """
+        if not clause:
+            return ['{}']
+        return [self.decode_literal(code) for code in clause]
+
+    def format_clause(self, clause):
+        # Định dạng mệnh đề theo đúng cách ghi ra file output
+        return ' OR '.join(self.decode_clause(clause))
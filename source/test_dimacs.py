@@ -0,0 +1,23 @@
+import pytest
+
+from Dimacs import parse_dimacs
+
+
+def test_var_names():
+    cnf = parse_dimacs(b"c var 1 Rain\nc var 3 X2_\np cnf 3 2\n1 -2 0\n-3 0\n")
+    assert [cnf.clause_to_text(clause) for clause in cnf.clauses] == [['Rain', '-X2'], ['-X2_']]
+
+
+@pytest.mark.parametrize('content, message', [
+    # Hai id cùng tên bị gộp thành một biến: [['A'], ['-A']] mâu thuẫn
+    (b"c var 1 A\nc var 2 A\np cnf 2 2\n1 0\n-2 0\n", "được dùng cho cả biến 1 và 2"),
+    # Trùng tên tự đặt X2 của biến 2
+    (b"c var 1 X2\np cnf 2 2\n1 0\n-2 0\n", "trùng tên tự đặt của biến 2"),
+    (b"c var 3 C\np cnf 2 1\n1 2 0\n", "nằm ngoài 1..2"),
+    (b"c var 0 C\np cnf 2 1\n1 2 0\n", "nằm ngoài 1..2"),
+    (b"c var 1 -A\np cnf 2 1\n1 2 0\n", "tên biến không hợp lệ"),
+    (b"c var 1 2B\np cnf 2 1\n1 2 0\n", "tên biến không hợp lệ"),
+])
+def test_invalid_var_names(content, message):
+    with pytest.raises(ValueError, match=message):
+        parse_dimacs(content)
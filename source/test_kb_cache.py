@@ -0,0 +1,62 @@
+import struct
+
+import pytest
+
+from Benchmark import build_knowledge_base
+from KBCache import HEADER, KBCache, compile_kb, load_kb
+
+
+KB = [['A', 'B'], ['-A', 'C'], ['-B'], ['C', '-D']]
+QUERY = [['C']]
+
+
+@pytest.fixture
+def compiled(tmp_path):
+    filepath = str(tmp_path / 'kb.kbc')
+    compile_kb(build_knowledge_base(KB), QUERY, filepath)
+    return filepath
+
+
+def test_round_trip(compiled):
+    knowledge_base, query = load_kb(compiled)
+    assert list(knowledge_base.database) == KB
+    assert query == QUERY
+
+
+@pytest.mark.parametrize('cut', [4, 12, 40])
+def test_truncated_file_is_a_miss(compiled, cut):
+    # File bị cắt cụt 12 byte từng được đọc thành [['A', 'B'], ['-A', 'C'], ['-B'], []]
+    with open(compiled, 'rb') as f:
+        data = f.read()
+    with open(compiled, 'wb') as f:
+        f.write(data[:-cut])
+    assert load_kb(compiled) is None
+
+
+def test_trailing_bytes_are_a_miss(compiled):
+    with open(compiled, 'ab') as f:
+        f.write(b'\0' * 4)
+    assert load_kb(compiled) is None
+
+
+def test_non_monotonic_offsets_are_a_miss(compiled):
+    with open(compiled, 'rb') as f:
+        data = bytearray(f.read())
+    names_size = HEADER.unpack_from(data)[3]
+    # Offset các mệnh đề KB đứng sau header, tên biến, offset và literal của query (1 mệnh đề, 1 literal)
+    position = HEADER.size + ((names_size + 3) & ~3) + 4 * (2 + 1)
+    offsets = list(struct.unpack_from('<5i', data, position))
+    offsets[1], offsets[2] = offsets[2], offsets[1]
+    struct.pack_into('<5i', data, position, *offsets)
+    with open(compiled, 'wb') as f:
+        f.write(data)
+    assert load_kb(compiled) is None
+
+
+def test_cache_reparses_corrupt_entry(tmp_path):
+    cache = KBCache(str(tmp_path))
+    cache.store('key', build_knowledge_base(KB), QUERY)
+    with open(cache.path('key'), 'r+b') as f:
+        f.truncate(f.seek(0, 2) - 12)
+    assert cache.load('key') is None
+    assert cache.misses == 1
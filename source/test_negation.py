@@ -0,0 +1,68 @@
+import itertools
+import random
+
+import pytest
+
+from Benchmark import build_knowledge_base
+from ResolutionSession import ResolutionSession
+
+
+def entails(clauses, query):
+    # Bảng chân trị: KB ⊨ α khi mọi phép gán thỏa KB đều thỏa α
+    names = sorted({literal.lstrip('-') for clause in clauses + query for literal in clause})
+
+    def holds(clause, values):
+        return any(values[literal.lstrip('-')] != literal.startswith('-') for literal in clause)
+
+    for assignment in itertools.product((False, True), repeat=len(names)):
+        values = dict(zip(names, assignment))
+        if all(holds(clause, values) for clause in clauses) and not all(holds(clause, values) for clause in query):
+            return False
+    return True
+
+
+def random_clauses(rng, names, count, max_length):
+    return [[rng.choice(('', '-')) + name for name in rng.sample(names, rng.randint(1, max_length))]
+            for _ in range(count)]
+
+
+def test_single_clause_alpha_is_the_same_in_both_modes():
+    knowledge_base = build_knowledge_base([['A', 'B']])
+    query = [['A', '-B', 'C']]
+    assert knowledge_base.invert_expression(query, 'tseitin') == knowledge_base.invert_expression(query)
+    assert knowledge_base.invert_expression(query) == [['-A'], ['B'], ['-C']]
+
+
+def test_tseitin_is_linear_with_fresh_symbols():
+    # _T1 đã có trong KB nên biến mới bắt đầu từ _T2; mệnh đề đơn của α không cần biến mới
+    knowledge_base = build_knowledge_base([['_T1', 'A']])
+    query = [['A', 'B'], ['-C'], ['B', 'C', 'D']]
+    assert knowledge_base.invert_expression(query, 'tseitin') == [
+        ['_T2', 'C', '_T3'],
+        ['-_T2', '-A'], ['-_T2', '-B'],
+        ['-_T3', '-B'], ['-_T3', '-C'], ['-_T3', '-D'],
+    ]
+    assert len(knowledge_base.invert_expression(query)) == 2 * 1 * 3
+
+
+def test_multi_clause_alpha_matches_truth_table():
+    rng = random.Random(2)
+    names = ['A', 'B', 'C', 'D']
+    for _ in range(60):
+        clauses = random_clauses(rng, names, rng.randint(2, 6), 3)
+        query = random_clauses(rng, names, rng.randint(2, 3), 2)
+        expected = entails(clauses, query)
+        for negation in ('distribute', 'tseitin'):
+            knowledge_base = build_knowledge_base(clauses)
+            _, is_proved = knowledge_base.prove_by_resolution(query, verbose=False, engine='int', incremental=True,
+                                                              use_index=True, subsumption=True, negation=negation)
+            assert is_proved == expected
+            assert knowledge_base.prove_by_cdcl(query, verbose=False, negation=negation) == expected
+            session = ResolutionSession(build_knowledge_base(clauses), subsumption=True, negation=negation)
+            assert session.prove(query) == expected
+
+
+@pytest.mark.parametrize('negation', ['distribute', 'tseitin'])
+def test_empty_clause_in_alpha(negation):
+    # α chứa mệnh đề rỗng luôn sai: ¬α không thêm mệnh đề nào
+    assert build_knowledge_base([['A']]).invert_expression([['A'], []], negation) == []
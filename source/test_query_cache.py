@@ -0,0 +1,69 @@
+from Benchmark import build_knowledge_base
+from QueryCache import QueryCache
+from ResourceBudget import UNKNOWN
+
+
+KB = [['-A', 'B'], ['B', '-C'], ['A', '-B', 'C'], ['-B']]
+REORDERED_KB = [['-B'], ['C', 'A', '-B'], ['-A', 'B'], ['-C', 'B']]
+QUERY = [['-A']]
+
+
+def test_trace_reused_only_for_same_order_and_options():
+    cache = QueryCache()
+    trace, verdict = cache.prove(build_knowledge_base(KB), QUERY, verbose=False)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    # Cùng thứ tự và tùy chọn: trả về đúng vết đã lưu, giống hệt lần chạy mới
+    assert cache.prove(build_knowledge_base(KB), QUERY, verbose=False) == (trace, verdict)
+    assert build_knowledge_base(KB).prove_by_resolution(QUERY, verbose=False) == (trace, verdict)
+    assert cache.hits == 1
+
+    # KB đổi thứ tự: dùng chung kết quả YES/NO nhưng không dùng vết
+    assert cache.lookup(build_knowledge_base(REORDERED_KB).database, QUERY) == (None, verdict)
+    assert cache.lookup(build_knowledge_base(REORDERED_KB).database, QUERY, {}, trace=True) is None
+
+    # Các tùy chọn làm thay đổi vết
+    for options in ({'subsumption': True}, {'unit_propagation': 'trace'}, {'negation': 'tseitin'}):
+        assert cache.lookup(build_knowledge_base(KB).database, QUERY, options, trace=True) is None
+    # Tùy chọn không làm thay đổi vết
+    assert cache.lookup(build_knowledge_base(KB).database, QUERY, {'engine': 'int'}, trace=True) == (trace, verdict)
+
+
+def test_lru_eviction_by_entries():
+    cache = QueryCache(max_entries=2)
+    for name in ('A', 'B', 'C'):
+        if name == 'C':
+            # Dùng lại A để B là mục ít được dùng gần đây nhất
+            assert cache.lookup(KB, [['A']]) == (None, True)
+        cache.store(KB, [[name]], True)
+    assert len(cache) == 2 and cache.evictions == 1
+    assert cache.lookup(KB, [['B']]) is None
+    assert cache.lookup(KB, [['A']]) is not None
+    assert cache.lookup(KB, [['C']]) is not None
+
+
+def test_eviction_by_trace_size():
+    cache = QueryCache(max_trace_clauses=5)
+    cache.store(KB, [['A']], True, [[['A']], [['B'], ['C']]])
+    cache.store(KB, [['B']], True, [[['A'], ['B']]])
+    assert cache.trace_clauses == 5 and cache.evictions == 0
+    cache.store(KB, [['C']], True, [[['C']]])
+    assert cache.evictions == 1 and cache.trace_clauses == 3
+    assert cache.lookup(KB, [['A']]) is None
+
+    # Vết lớn hơn giới hạn: chỉ giữ kết quả YES/NO
+    cache.store(KB, [['D']], False, [[['A'], ['B'], ['C'], ['D'], ['E'], ['F']]])
+    assert cache.lookup(KB, [['D']]) == (None, False)
+    assert cache.lookup(KB, [['D']], trace=True) is None
+
+
+def test_store_keeps_existing_trace_and_skips_unknown():
+    cache = QueryCache()
+    trace = [[['B']]]
+    cache.store(KB, QUERY, True, trace)
+    cache.store(KB, QUERY, True)
+    assert cache.lookup(KB, QUERY, trace=True) == (trace, True)
+    assert cache.trace_clauses == 1
+
+    cache.store(KB, [['C']], UNKNOWN)
+    assert cache.lookup(KB, [['C']]) is None
@@ -0,0 +1,99 @@
+import itertools
+import random
+
+import pytest
+
+from Benchmark import build_knowledge_base, random_cnf
+from SatSolver import CDCLSolver, luby
+
+
+def satisfiable(num_vars, clauses):
+    # Bảng chân trị: thử mọi phép gán của num_vars biến
+    for values in itertools.product((False, True), repeat=num_vars):
+        if all(any(values[abs(literal) - 1] == (literal > 0) for literal in clause) for clause in clauses):
+            return True
+    return False
+
+
+def random_clauses(rng, num_vars, num_clauses):
+    # Mệnh đề số nguyên độ dài 1-4, có thể chứa literal lặp lại hoặc hằng đúng
+    return [[rng.choice((1, -1)) * rng.randint(1, num_vars) for _ in range(rng.randint(1, 4))]
+            for _ in range(num_clauses)]
+
+
+class CheckedSolver(CDCLSolver):
+    """
+    CDCLSolver kiểm tra mỗi mệnh đề học được: phải được suy ra từ các mệnh đề ban đầu,
+    literal khẳng định là literal duy nhất ở mức xung đột và mức quay lui nhỏ hơn mức đó
+    """
+
+    def __init__(self, num_vars, clauses):
+        self.original = [list(clause) for clause in clauses]
+        super().__init__(num_vars, clauses)
+
+    def analyze(self, conflict):
+        current_level = len(self.trail_limits)
+        learnt, level = super().analyze(conflict)
+        assert not satisfiable(self.num_vars, self.original + [[-literal] for literal in learnt])
+        assert self.levels[abs(learnt[0])] == current_level
+        assert all(self.levels[abs(literal)] < current_level for literal in learnt[1:])
+        assert level == max((self.levels[abs(literal)] for literal in learnt[1:]), default=0)
+        return learnt, level
+
+
+def test_luby():
+    assert [luby(index) for index in range(1, 16)] == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+
+
+@pytest.mark.parametrize('restart_base', [CDCLSolver.RESTART_BASE, 1])
+def test_solver_matches_truth_table(restart_base):
+    rng = random.Random(0)
+    restarts = 0
+    for _ in range(300):
+        num_vars = rng.randint(1, 7)
+        clauses = random_clauses(rng, num_vars, rng.randint(1, 5 * num_vars))
+        solver = CheckedSolver(num_vars, clauses)
+        solver.RESTART_BASE = restart_base
+        result = solver.solve()
+        assert result == satisfiable(num_vars, clauses)
+        if result:
+            model = solver.model()
+            assert all(any(model[abs(literal)] == (literal > 0) for literal in clause) for clause in clauses)
+        restarts += solver.restarts
+    if restart_base == 1:
+        # Khởi động lại sau mỗi xung đột vẫn cho kết quả đúng
+        assert restarts > 0
+
+
+def test_level_zero_conflicts():
+    # Xung đột ngay khi thêm mệnh đề đơn, khi lan truyền ban đầu và sau khi học mệnh đề
+    assert CDCLSolver(1, [[1], [-1]]).solve() is False
+    assert CDCLSolver(2, [[1], [-1, 2], [-2]]).solve() is False
+    solver = CDCLSolver(2, [[1, 2], [1, -2], [-1, 2], [-1, -2]])
+    assert solver.solve() is False
+    assert solver.conflicts > 0 and solver.decisions > 0
+    assert CDCLSolver(1, [[]]).solve() is False
+    assert CDCLSolver(0, []).solve() is True
+
+
+def test_prove_by_cdcl_matches_truth_table_and_resolution():
+    rng = random.Random(1)
+    for num_vars in (3, 4, 5):
+        for num_clauses in (num_vars, 2 * num_vars, 4 * num_vars):
+            for _ in range(10):
+                clauses, query = random_cnf(rng, num_vars, num_clauses, 3)
+                # KB ⊨ α khi KB ∧ ¬α không thỏa được (α là một literal)
+                names = sorted({literal.lstrip('-') for clause in clauses + query for literal in clause})
+                ids = {name: i for i, name in enumerate(names, 1)}
+
+                def encode(literal):
+                    return -ids[literal[1:]] if literal[0] == '-' else ids[literal]
+
+                negated = [-encode(query[0][0])]
+                expected = not satisfiable(len(names), [[encode(literal) for literal in clause]
+                                                        for clause in clauses] + [negated])
+                knowledge_base = build_knowledge_base(clauses)
+                assert knowledge_base.prove_by_cdcl(query, verbose=False) == expected
+                _, is_proved = knowledge_base.prove_by_resolution(query, verbose=False, record_path=False,
+                                                                  engine='int')
+                assert is_proved == expected
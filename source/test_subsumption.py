@@ -0,0 +1,39 @@
+import pytest
+
+from Benchmark import ENGINES, build_knowledge_base
+from ResolutionSession import ResolutionSession
+
+
+# ¬α = A: chỉ hợp giải được tới {} qua B OR B × -B OR -A và -B OR -B × A OR -B,
+# nên -B OR -B (ngữ nghĩa đa tập) không được loại -B OR -A hay A OR -B
+MULTISET_KB = [['B', 'B'], ['-B', '-A'], ['-B', '-B'], ['A', '-B']]
+MULTISET_ALPHA = [['-A']]
+
+
+@pytest.mark.parametrize('options', [
+    {},
+    {'engine': 'int'},
+    {'engine': 'int', 'incremental': True, 'use_index': True},
+    {'engine': 'numpy'},
+])
+def test_repeated_literal_clause_does_not_subsume(options):
+    if options.get('engine') == 'numpy':
+        pytest.importorskip('numpy')
+    knowledge_base = build_knowledge_base(MULTISET_KB)
+    _, expected = knowledge_base.prove_by_resolution(MULTISET_ALPHA, verbose=False, **options)
+    _, is_proved = knowledge_base.prove_by_resolution(MULTISET_ALPHA, verbose=False, subsumption=True, **options)
+    assert expected is True
+    assert is_proved is True
+
+
+def test_session_repeated_literal_clause_does_not_subsume():
+    expected = ResolutionSession(build_knowledge_base(MULTISET_KB)).prove(MULTISET_ALPHA)
+    session = ResolutionSession(build_knowledge_base(MULTISET_KB), subsumption=True)
+    assert expected is True
+    assert session.prove(MULTISET_ALPHA) is True
+
+
+@pytest.mark.parametrize('engine', ['session', 'resolution-fast'])
+def test_benchmark_engine_repeated_literal_clause(engine):
+    is_proved, _ = ENGINES[engine](build_knowledge_base(MULTISET_KB), MULTISET_ALPHA, None)
+    assert is_proved is True